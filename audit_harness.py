@@ -0,0 +1,211 @@
+import sys
+import asyncio
+import inspect
+import contextlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from payloads import Inputs, inputs_for
+
+# audit events worth attributing to a handler, by sink category (see sinks.py)
+WATCHED_EVENTS = {
+    "subprocess.Popen": "process",
+    "os.system": "process",
+    "os.exec": "process",
+    "os.posix_spawn": "process",
+    "os.spawn": "process",
+    "os.fork": "process",
+    "os.kill": "process",
+    "pty.spawn": "process",
+
+    "open": "filesystem",
+    "os.chdir": "filesystem",
+    "os.listdir": "filesystem",
+    "os.scandir": "filesystem",
+    "os.remove": "filesystem",
+    "os.rename": "filesystem",
+    "os.mkdir": "filesystem",
+    "os.rmdir": "filesystem",
+    "os.chmod": "filesystem",
+    "shutil.copyfile": "filesystem",
+    "shutil.move": "filesystem",
+    "shutil.rmtree": "filesystem",
+    "glob.glob": "filesystem",
+
+    "socket.connect": "network",
+    "socket.getaddrinfo": "network",
+    "socket.sendto": "network",
+    "socket.sendmsg": "network",
+    "socket.bind": "network",
+    "urllib.Request": "network",
+    "http.client.connect": "network",
+    "http.client.send": "network",
+    "smtplib.connect": "network",
+    "ftplib.connect": "network",
+
+    "os.putenv": "env",
+    "os.unsetenv": "env",
+}
+
+CAPACITY_DEFAULT = 4096
+DETAIL_CHARS = 200
+HANDLER_METHODS_DEFAULT = ("on_llm_start", "on_llm_end")
+
+class AuditBuffer:
+    """
+    Fixed-size event store filled by the audit hook. Slots are allocated up
+    front and the hook only stores (method, event, args) references, so
+    recording costs one tuple per watched event; events past capacity are
+    counted as dropped. Formatting happens when the buffer is read.
+    """
+    def __init__(self, capacity: int = CAPACITY_DEFAULT):
+        self.capacity = capacity
+        self.slots: List[Optional[Tuple[Optional[str], str, tuple]]] = [None] * capacity
+        self.size = 0
+        self.dropped = 0
+        self.method: Optional[str] = None
+
+    def record(self, event: str, args: tuple):
+        if self.size < self.capacity:
+            self.slots[self.size] = (self.method, event, args)
+            self.size += 1
+        else:
+            self.dropped += 1
+
+    def clear(self):
+        for i in range(self.size):
+            self.slots[i] = None
+        self.size = 0
+        self.dropped = 0
+        self.method = None
+
+    @contextlib.contextmanager
+    def attribute(self, method: str) -> Iterator["AuditBuffer"]:
+        """Attribute events recorded inside the block to method."""
+        previous, self.method = self.method, method
+        try:
+            yield self
+        finally:
+            self.method = previous
+
+    def events(self) -> List[Dict]:
+        return [
+            {"method": method, "event": event, "category": WATCHED_EVENTS[event], "detail": _detail(event, args)}
+            for method, event, args in self.slots[:self.size]
+        ]
+
+def _detail(event: str, args: tuple) -> str:
+    if event == "subprocess.Popen" and len(args) > 1:
+        # (executable, args, cwd, env)
+        value = args[1]
+    elif event.startswith("socket.") and len(args) > 1:
+        # (socket, address, ...)
+        value = args[1]
+    elif args:
+        value = args[0]
+    else:
+        value = ""
+    text = value if isinstance(value, str) else repr(value)
+    return text[:DETAIL_CHARS]
+
+_active: Optional[AuditBuffer] = None
+_installed = False
+
+def _audit_hook(event: str, args: tuple):
+    # runs for every audit event in the process: keep the idle path to one global read
+    buffer = _active
+    if buffer is None or buffer.method is None:
+        return
+    if event in WATCHED_EVENTS:
+        buffer.record(event, args)
+
+def install():
+    """Register the audit hook once; hooks cannot be removed, so it idles between captures."""
+    global _installed
+    if not _installed:
+        sys.addaudithook(_audit_hook)
+        _installed = True
+
+def current_method() -> Optional[str]:
+    """The handler method events are being attributed to, if a capture is running."""
+    buffer = _active
+    return buffer.method if buffer is not None else None
+
+@contextlib.contextmanager
+def capture(buffer: AuditBuffer) -> Iterator[AuditBuffer]:
+    """Route audit events to buffer for the duration of the block."""
+    global _active
+    install()
+    previous, _active = _active, buffer
+    try:
+        yield buffer
+    finally:
+        _active = previous
+
+def _fit_call(fn, positional: Sequence[Any], keywords: Dict[str, Any]) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Trim the canonical event arguments to what fn accepts: handlers rename
+    positional parameters (`outputs` for `serialized`) and often drop **kwargs.
+    """
+    try:
+        params = list(inspect.signature(fn).parameters.values())
+    except (TypeError, ValueError):
+        return list(positional), dict(keywords)
+    if any(p.kind == p.VAR_POSITIONAL for p in params):
+        args = list(positional)
+    else:
+        slots = [p for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+        args = list(positional[:len(slots)])
+        taken = {p.name for p in slots[:len(args)]}
+        keywords = {k: v for k, v in keywords.items() if k not in taken}
+    if not any(p.kind == p.VAR_KEYWORD for p in params):
+        names = {p.name for p in params if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)}
+        keywords = {k: v for k, v in keywords.items() if k in names}
+    return args, keywords
+
+def run_handler(handler: Any,
+                methods: Sequence[str] = HANDLER_METHODS_DEFAULT,
+                inputs: Dict[str, Inputs] = None,
+                buffer: AuditBuffer = None) -> Dict:
+    """
+    Call each of handler's methods with controlled inputs (by default
+    payloads.inputs_for its signatures) under the audit hook and return
+    {"handler", "calls", "events", "dropped"}. calls holds one
+    {"method", "error"} per method called; events holds every watched audit
+    event with the method it happened in. Pass a buffer to reuse its slots
+    across candidates.
+    """
+    if inputs is None:
+        inputs = inputs_for(handler, methods)
+    if buffer is None:
+        buffer = AuditBuffer()
+    buffer.clear()
+    calls = []
+    loop = None
+    with capture(buffer):
+        for name in methods:
+            method = getattr(handler, name, None)
+            if method is None or name not in inputs:
+                continue
+            positional, keywords = inputs[name]
+            args, kwargs = _fit_call(method, positional, keywords)
+            error = None
+            if inspect.iscoroutinefunction(method) and loop is None:
+                # create the loop outside attribution so its own sockets are not blamed on the handler
+                loop = asyncio.new_event_loop()
+            try:
+                with buffer.attribute(name):
+                    result = method(*args, **kwargs)
+                    if inspect.isawaitable(result):
+                        loop = loop or asyncio.new_event_loop()
+                        loop.run_until_complete(result)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            calls.append({"method": name, "error": error})
+    if loop is not None:
+        loop.close()
+    return {
+        "handler": f"{type(handler).__module__}.{type(handler).__qualname__}",
+        "calls": calls,
+        "events": buffer.events(),
+        "dropped": buffer.dropped,
+    }
@@ -0,0 +1,269 @@
+import os
+import sys
+import ast
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from scan_profile import ScanProfiler
+from scanner import iter_py_files, load_event_trigger, read_source
+from statistics import MODE_OPTIONS, count_functions_in_repo
+
+LANGCHAIN_PACKAGES = [
+    "callbacks", "chains", "agents", "tools", "retrievers", "llms",
+    "chat_models", "embeddings", "schema", "memory", "utils", "tracers",
+]
+HANDLER_EVENTS = [
+    "llm_start", "llm_end", "llm_error", "chat_model_start", "chain_start", "chain_end",
+    "tool_start", "tool_end", "agent_action", "agent_finish", "retriever_start", "retriever_end", "text",
+]
+EXCLUDED_NOISE_DIRS = ["tests", "examples", "docs"]
+
+# regression thresholds: relative slack allowed against the stored baseline
+THROUGHPUT_TOLERANCE = 0.20
+RSS_TOLERANCE = 0.25
+# run parameters that change what is measured; a baseline only applies to runs that agree on all of them
+BASELINE_PARAMS = ("files", "classes", "methods", "handler_ratio", "depth", "seed", "jobs")
+
+def _handler_method(rng: random.Random, indent: str) -> List[str]:
+    event = rng.choice(HANDLER_EVENTS)
+    prefix = "async def" if rng.random() < 0.2 else "def"
+    return [
+        f"{indent}{prefix} on_{event}(self, serialized: Dict[str, Any], prompts: List[str], *,",
+        f"{indent}        run_id: UUID, parent_run_id: Optional[UUID] = None,",
+        f"{indent}        tags: Optional[List[str]] = None, metadata: Optional[Dict[str, Any]] = None,",
+        f"{indent}        **kwargs: Any) -> None:",
+        f'{indent}    """Run on {event.replace("_", " ")}."""',
+        f"{indent}    self.events.append(({event!r}, run_id, len(prompts)))",
+        "",
+    ]
+
+def _plain_method(rng: random.Random, indent: str, i: int, depth: int) -> List[str]:
+    roll = rng.random()
+    name = f"method_{i}" if rng.random() > 0.15 else f"_helper_{i}"
+    lines = []
+    if roll < 0.1:
+        lines += [f"{indent}@property", f"{indent}def {name}(self) -> int:", f"{indent}    return {i}"]
+    elif roll < 0.2:
+        lines += [f"{indent}@abstractmethod", f"{indent}def {name}(self, value: Any) -> Any:", f"{indent}    ..."]
+    elif roll < 0.25:
+        lines += [f"{indent}def {name}(self, value: Any) -> Any:", f"{indent}    raise NotImplementedError"]
+    else:
+        lines += [f"{indent}def {name}(self, value: Any, *args: Any, **kwargs: Any) -> Any:"]
+        body = indent + "    "
+        for d in range(rng.randint(0, depth)):
+            lines += [f"{body}def inner_{d}(x):"]
+            body += "    "
+        lines += [f"{body}result = [v for v in range({i}) if v % 3]", f"{body}return result"]
+    lines.append("")
+    return lines
+
+def _module_source(rng: random.Random, package: str, classes: int, methods: int,
+                   handler_ratio: float, depth: int) -> str:
+    lines = [
+        f'"""Synthetic {package} module."""',
+        "from abc import ABC, abstractmethod",
+        "from typing import Any, Dict, List, Optional",
+        "from uuid import UUID",
+        "",
+        "from langchain_core.callbacks import BaseCallbackHandler",
+        "",
+    ]
+    for c in range(classes):
+        if rng.random() < handler_ratio:
+            lines += [f"class {package.title().replace('_', '')}{c}CallbackHandler(BaseCallbackHandler):",
+                      "    def __init__(self) -> None:", "        self.events = []", ""]
+            for _ in range(rng.randint(1, methods)):
+                lines += _handler_method(rng, "    ")
+        else:
+            lines += [f"class {package.title().replace('_', '')}{c}(ABC):", '    """Component."""', ""]
+        for m in range(methods):
+            lines += _plain_method(rng, "    ", m, depth)
+    for f in range(rng.randint(1, 4)):
+        lines += [f"def build_{package}_{f}(config: Dict[str, Any]) -> Any:", "    return dict(config)", ""]
+    return "\n".join(lines) + "\n"
+
+def generate_synthetic_repo(root: str, files: int = 500, classes_per_file: int = 4,
+                            methods_per_class: int = 8, handler_ratio: float = 0.25,
+                            nesting_depth: int = 2, seed: int = 0) -> str:
+    """
+    Write a LangChain-shaped package tree under root: nested subpackages,
+    callback handler classes with on_* methods, properties, abstract and
+    stub methods, nested functions, plus test and docs noise the scanners
+    must skip. Deterministic for a given seed.
+    """
+    rng = random.Random(seed)
+    base = os.path.join(root, "langchain")
+    for i in range(files):
+        package = rng.choice(LANGCHAIN_PACKAGES)
+        parts = [package] + [f"sub{rng.randint(0, 3)}" for _ in range(rng.randint(0, nesting_depth))]
+        directory = os.path.join(base, *parts)
+        os.makedirs(directory, exist_ok=True)
+        src = _module_source(rng, package, rng.randint(1, classes_per_file), methods_per_class,
+                             handler_ratio, nesting_depth)
+        with open(os.path.join(directory, f"{package}_{i}.py"), "w", encoding="utf-8") as f:
+            f.write(src)
+        if i % 10 == 0:
+            noise = os.path.join(base, package, rng.choice(EXCLUDED_NOISE_DIRS))
+            os.makedirs(noise, exist_ok=True)
+            with open(os.path.join(noise, f"test_{package}_{i}.py"), "w", encoding="utf-8") as f:
+                f.write(src)
+    return base
+
+def _peak_rss_mb() -> float:
+    """
+    High-water RSS of this process plus that of its largest finished child,
+    i.e. a scan pool worker. Both are lifetime maxima that never go down, so
+    they only describe one case when the case has a process to itself.
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _best_of(repeat: int, fn: Callable[[], object]) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def _run_case(case: str, repo: str, repeat: int, jobs: int) -> Tuple[float, int, float]:
+    # (best seconds, functions or triggers found, peak RSS MB); runs in a fresh process
+    if case == "triggers":
+        et = load_event_trigger()
+        seconds, triggers = _best_of(repeat, lambda: et.find_event_triggers_in_repo(repo, "LangChain", jobs=jobs))
+        return seconds, len(triggers), _peak_rss_mb()
+    mode = case.split(":", 1)[1]
+    seconds, (functions, _) = _best_of(repeat, lambda: count_functions_in_repo(repo, mode=mode, jobs=jobs))
+    return seconds, functions, _peak_rss_mb()
+
+def _measure_case(case: str, repo: str, repeat: int, jobs: int) -> Tuple[float, int, float]:
+    # a spawned process per case, so its peak RSS is not an earlier case's
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_run_case, case, repo, repeat, jobs).result()
+
+def run_benchmarks(repo: str, repeat: int = 3, jobs: int = 1) -> Dict:
+    """
+    Time the scan phases and every scanner entry point on repo, best of
+    `repeat`. Throughputs are per second of the best run; "profile" holds
+    the ScanProfiler breakdown of one more trigger scan. Each entry point runs
+    in its own process, and its peak_rss_mb covers that process and its
+    largest pool worker; the top-level peak_rss_mb is the largest of them.
+    """
+    et = load_event_trigger()
+    results: Dict = {"phases": {}, "cases": {}}
+
+    walk_s, paths = _best_of(repeat, lambda: list(iter_py_files(repo)))
+    read_s, sources = _best_of(repeat, lambda: [read_source(p) for p in paths])
+    parse_s, _ = _best_of(repeat, lambda: [ast.parse(s.decode("utf-8", errors="ignore")) for s in sources])
+    results["phases"] = {"walk": walk_s, "read": read_s, "parse": parse_s}
+    files = len(paths)
+
+    for mode in MODE_OPTIONS:
+        seconds, functions, peak = _measure_case(f"count:{mode}", repo, repeat, jobs)
+        results["cases"][f"count:{mode}"] = {
+            "seconds": seconds, "files": files, "functions": functions,
+            "files_per_sec": files / seconds, "functions_per_sec": functions / seconds,
+            "peak_rss_mb": peak,
+        }
+
+    seconds, triggers, peak = _measure_case("triggers", repo, repeat, jobs)
+    results["cases"]["triggers"] = {
+        "seconds": seconds, "files": files, "triggers": triggers,
+        "files_per_sec": files / seconds, "peak_rss_mb": peak,
+    }
+    # one extra profiled run, outside the timed cases, for the phase breakdown
+    with ScanProfiler() as prof:
+        et.find_event_triggers_in_repo(repo, "LangChain", jobs=jobs)
+    results["profile"] = prof.to_dict()
+    results["peak_rss_mb"] = max(case["peak_rss_mb"] for case in results["cases"].values())
+    return results
+
+def compare_to_baseline(results: Dict, baseline: Dict,
+                        throughput_tolerance: float = THROUGHPUT_TOLERANCE,
+                        rss_tolerance: float = RSS_TOLERANCE) -> List[str]:
+    """
+    Regression messages for every case slower or hungrier than the baseline
+    allows. Raises ValueError if the two runs differ in any BASELINE_PARAMS,
+    since their numbers are then not comparable.
+    """
+    base_params, params = baseline.get("params") or {}, results.get("params") or {}
+    differ = [f"{name} {params.get(name)} vs baseline {base_params.get(name)}"
+              for name in BASELINE_PARAMS if params.get(name) != base_params.get(name)]
+    if differ:
+        raise ValueError(f"Baseline was recorded with different parameters: {', '.join(differ)}")
+    failures = []
+    for case, base in baseline.get("cases", {}).items():
+        cur = results["cases"].get(case)
+        if cur is None:
+            failures.append(f"{case}: missing from this run")
+            continue
+        for metric in ("files_per_sec", "functions_per_sec"):
+            if metric in base and cur[metric] < base[metric] * (1 - throughput_tolerance):
+                failures.append(f"{case}: {metric} {cur[metric]:.0f} < baseline {base[metric]:.0f}")
+    if results["peak_rss_mb"] > baseline.get("peak_rss_mb", float("inf")) * (1 + rss_tolerance):
+        failures.append(f"peak_rss_mb {results['peak_rss_mb']:.1f} > baseline {baseline['peak_rss_mb']:.1f}")
+    return failures
+
+def print_report(results: Dict):
+    header = f"{'Case':<24} | {'Seconds':<8} | {'Files/s':<9} | {'Funcs/s':<9} | {'Peak RSS MB':<11}"
+    print(header)
+    print("-" * len(header))
+    for phase, seconds in results["phases"].items():
+        print(f"{'phase:' + phase:<24} | {seconds:<8.3f} | {'':<9} | {'':<9} | {'':<11}")
+    for case, r in results["cases"].items():
+        funcs = f"{r['functions_per_sec']:.0f}" if "functions_per_sec" in r else ""
+        print(f"{case:<24} | {r['seconds']:<8.3f} | {r['files_per_sec']:<9.0f} | {funcs:<9} | {r['peak_rss_mb']:<11.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scanner throughput on a synthetic LangChain-shaped tree")
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--classes", type=int, default=4)
+    parser.add_argument("--methods", type=int, default=8)
+    parser.add_argument("--handler-ratio", type=float, default=0.25)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--baseline", help="compare against this JSON baseline and exit 1 on regression")
+    parser.add_argument("--save-baseline", help="write this run's results as the new baseline")
+    parser.add_argument("--json", help="write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="threatforge-bench-")
+    try:
+        repo = generate_synthetic_repo(workdir, args.files, args.classes, args.methods,
+                                       args.handler_ratio, args.depth, args.seed)
+        results = run_benchmarks(repo, repeat=args.repeat, jobs=args.jobs)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    results["params"] = vars(args)
+
+    print_report(results)
+    for target in (args.json, args.save_baseline):
+        if target:
+            with open(target, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        try:
+            failures = compare_to_baseline(results, baseline)
+        except ValueError as e:
+            print(f"[WARN] {e}")
+            sys.exit(2)
+        for msg in failures:
+            print(f"[REGRESSION] {msg}")
+        sys.exit(1 if failures else 0)
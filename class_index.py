@@ -0,0 +1,225 @@
+import os
+import ast
+from concurrent.futures import Executor
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from scan_cache import ScanCache
+from scanner import iter_scan
+
+# bump whenever class records change so cached scans are dropped
+EXTRACTOR_VERSION = 1
+
+# well-known callback roots whose names carry none of the hint tokens; matched
+# on the last component when the base is defined outside the indexed tree
+CALLBACK_BASE_NAMES = {"BaseTracer", "BaseEventHandler", "BaseSpanHandler"}
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Subscript):
+        # Generic[T], BaseTracer[...]: the subscripted class is the base
+        node = node.value
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+class _ClassDefCollector:
+    """
+    Module-level bindings that can name a class: imports, class definitions
+    (nested ones by dotted qualname) and `Alias = some.Name` assignments.
+    Function bodies are not entered.
+    """
+    def __init__(self):
+        self.records: List[Dict] = []
+
+    def visit_body(self, body: List[ast.stmt], prefix: str = ""):
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                name = prefix + node.name
+                bases = [b for b in map(_dotted, node.bases) if b]
+                self.records.append({"kind": "class", "name": name, "bases": bases})
+                self.visit_body(node.body, name + ".")
+            elif prefix:
+                continue
+            elif isinstance(node, ast.Import):
+                for a in node.names:
+                    if a.asname:
+                        self.records.append({"kind": "import", "name": a.asname, "module": a.name,
+                                             "level": 0, "attr": None})
+                    else:
+                        head = a.name.split(".")[0]
+                        self.records.append({"kind": "import", "name": head, "module": head,
+                                             "level": 0, "attr": None})
+            elif isinstance(node, ast.ImportFrom):
+                for a in node.names:
+                    if a.name == "*":
+                        continue
+                    self.records.append({"kind": "import", "name": a.asname or a.name, "module": node.module or "",
+                                         "level": node.level, "attr": a.name})
+            elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                target = _dotted(node.value)
+                if target:
+                    self.records.append({"kind": "alias", "name": node.targets[0].id, "target": target})
+            elif isinstance(node, (ast.If, ast.Try)):
+                # TYPE_CHECKING and try/except ImportError fallbacks
+                self.visit_body(node.body)
+                for handler in getattr(node, "handlers", []):
+                    self.visit_body(handler.body)
+                self.visit_body(node.orelse)
+
+def collect_class_defs(tree: ast.AST) -> List[Dict]:
+    collector = _ClassDefCollector()
+    collector.visit_body(getattr(tree, "body", []))
+    return collector.records
+
+def module_name(path: str, package_dirs: Set[str]) -> str:
+    """Dotted module name of path, climbing through directories that hold an __init__.py."""
+    directory, file = os.path.split(path)
+    stem = file[:-3] if file.endswith(".py") else file
+    parts = [] if stem == "__init__" else [stem]
+    while directory in package_dirs:
+        directory, package = os.path.split(directory)
+        parts.insert(0, package)
+    return ".".join(parts)
+
+def _absolute_module(module: str, is_package: bool, level: int, target: str) -> str:
+    if level == 0:
+        return target
+    base = module.split(".") if module else []
+    if not is_package:
+        base = base[:-1]
+    if level > 1:
+        base = base[:len(base) - (level - 1)]
+    return ".".join(base + ([target] if target else []))
+
+class ClassIndex:
+    """
+    Repo-wide class hierarchy built from collect_class_defs records. Base
+    names are resolved through imports, relative imports, package re-exports
+    and module-level aliases, and every class's "transitively derives from a
+    callback class" flag is computed once, so lookups are a set membership.
+
+    A class is a callback class when its own name or any base as written
+    contains a hint token, a base resolved outside the tree is one of
+    CALLBACK_BASE_NAMES, or a base resolved inside the tree is a callback class.
+    """
+    def __init__(self, scans: Iterable[Tuple[str, List[Dict]]], hints: Iterable[str]):
+        scans = list(scans)
+        self.hints = frozenset(h.lower() for h in hints)
+        package_dirs = {os.path.dirname(p) for p, _ in scans if os.path.basename(p) == "__init__.py"}
+        self.file_modules: Dict[str, str] = {}
+        self.scopes: Dict[str, Dict[str, str]] = {}
+        self.classes: Dict[str, Tuple[str, List[str]]] = {}
+        aliases: List[Tuple[str, str, str]] = []
+
+        for path, records in scans:
+            module = module_name(path, package_dirs)
+            is_package = os.path.basename(path) == "__init__.py"
+            self.file_modules[path] = module
+            scope = self.scopes.setdefault(module, {})
+            for r in records:
+                if r["kind"] == "class":
+                    fq = f"{module}.{r['name']}" if module else r["name"]
+                    self.classes[fq] = (module, r["bases"])
+                    if "." not in r["name"]:
+                        scope[r["name"]] = fq
+                elif r["kind"] == "import":
+                    source = _absolute_module(module, is_package, r["level"], r["module"])
+                    scope[r["name"]] = f"{source}.{r['attr']}" if r["attr"] else source
+                else:
+                    aliases.append((module, r["name"], r["target"]))
+        for module, name, target in aliases:
+            self.scopes[module].setdefault(name, self.resolve(module, target))
+
+        self._memo: Dict[str, bool] = {}
+        self.callbacks: FrozenSet[str] = frozenset(fq for fq in self.classes if self._is_callback(fq, set())[0])
+
+    def __len__(self) -> int:
+        return len(self.classes)
+
+    def _canonical(self, fq: str) -> str:
+        # follow re-exports such as `from .base import BaseTracer` in __init__.py
+        seen = set()
+        while fq not in self.classes and fq not in seen:
+            seen.add(fq)
+            module, _, attr = fq.rpartition(".")
+            rest = ""
+            while module and module not in self.scopes:
+                module, _, parent = module.rpartition(".")
+                attr, rest = parent, f".{attr}{rest}"
+            target = self.scopes.get(module, {}).get(attr) if module else None
+            if target is None:
+                break
+            fq = target + rest
+        return fq
+
+    def resolve(self, module: str, dotted: str) -> str:
+        """Fully qualified name that dotted refers to inside module."""
+        head, _, rest = dotted.partition(".")
+        target = self.scopes.get(module, {}).get(head)
+        if target is None:
+            return self._canonical(dotted)
+        return self._canonical(f"{target}.{rest}" if rest else target)
+
+    def _hinted(self, name: str) -> bool:
+        name = name.lower()
+        return any(tok in name for tok in self.hints)
+
+    def _is_callback(self, fq: str, active: Set[str]) -> Tuple[bool, bool]:
+        """
+        (is callback class, final). A class already on the active path answers
+        a provisional False to break an inheritance cycle; a False that relied
+        on one is not final until the walk is back at the class it named, so
+        only final answers are memoized.
+        """
+        known = self._memo.get(fq)
+        if known is not None:
+            return known, True
+        if fq in active:
+            return False, False
+        active.add(fq)
+        module, bases = self.classes[fq]
+        result = self._hinted(fq.rsplit(".", 1)[-1])
+        final = True
+        for base in bases:
+            if result:
+                break
+            resolved = self.resolve(module, base)
+            if self._hinted(base):
+                result = True
+            elif resolved in self.classes:
+                result, base_final = self._is_callback(resolved, active)
+                final = final and base_final
+            else:
+                result = resolved.rsplit(".", 1)[-1] in CALLBACK_BASE_NAMES
+        active.discard(fq)
+        # True is final whatever it relied on; a provisional False is final once no caller is left
+        if result or final or not active:
+            self._memo[fq] = result
+            return result, True
+        return result, False
+
+    def is_callback(self, fq: str) -> bool:
+        return fq in self.callbacks
+
+    def is_callback_class(self, path: str, qualname: str) -> bool:
+        """Whether the class qualname ("Outer.Inner" if nested) of the scanned file path is a callback class."""
+        module = self.file_modules.get(path)
+        if module is None:
+            return False
+        return (f"{module}.{qualname}" if module else qualname) in self.callbacks
+
+    @classmethod
+    def from_repo(cls, repo_path: str, hints: Iterable[str],
+                  exclude_dirs: Set[str] = None,
+                  jobs: int = 1,
+                  executor: Executor = None,
+                  cache: ScanCache = None) -> "ClassIndex":
+        """Index every source file of repo_path in one scan."""
+        scans = ((path, found["classes"]) for path, found in iter_scan(
+            repo_path, {"classes": collect_class_defs}, exclude_dirs,
+            jobs=jobs, executor=executor, cache=cache))
+        return cls(scans, hints)
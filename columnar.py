@@ -0,0 +1,240 @@
+import functools
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scanner import iter_scan, load_event_trigger
+from sinks import SINK_CATEGORIES
+from statistics import collect_functions, mode_options
+
+SCORE_BUCKETS_DEFAULT = (1, 2, 3, 4, 5, 6)
+
+class Categories:
+    """
+    Interned values. Rows store int codes into `values`, so a file path or tag
+    repeated across thousands of records is held once.
+    """
+    def __init__(self):
+        self.values: List[Hashable] = []
+        self.index: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: Hashable) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+def _codes(cats: Categories, values: Iterable[Hashable], count: int, dtype=np.int32) -> np.ndarray:
+    return np.fromiter((cats.code(v) for v in values), dtype=dtype, count=count)
+
+def _per_code(cats: Categories, counts: np.ndarray) -> Dict[Hashable, float]:
+    return {cats.values[i]: counts[i].item() for i in range(len(cats))}
+
+class TriggerTable:
+    """
+    Trigger records as NumPy columns: categorical framework, file, class and
+    func codes, lineno and score, row x tag and row x SINK_CATEGORIES boolean
+    matrices and an over-privileged flag filled in by validation.
+    """
+    def __init__(self, frameworks: Categories, paths: Categories, names: Categories, tag_names: Categories,
+                 framework: np.ndarray, file: np.ndarray, cls: np.ndarray, func: np.ndarray,
+                 lineno: np.ndarray, score: np.ndarray, tags: np.ndarray, sinks: np.ndarray):
+        self.frameworks = frameworks
+        self.paths = paths
+        self.names = names
+        self.tag_names = tag_names
+        self.framework = framework
+        self.file = file
+        self.cls = cls
+        self.func = func
+        self.lineno = lineno
+        self.score = score
+        self.tags = tags
+        self.sinks = sinks
+        self.overprivileged = np.zeros(len(score), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    @classmethod
+    def from_scans(cls, scans: Dict[str, Sequence[Dict]]) -> "TriggerTable":
+        """Build from {framework: trigger records}, e.g. find_event_triggers_in_repo results."""
+        frameworks, paths, names, tag_names = Categories(), Categories(), Categories(), Categories()
+        for fw in scans:
+            frameworks.code(fw)
+        records = [(fw, r) for fw, rs in scans.items() for r in rs]
+        n = len(records)
+        framework = _codes(frameworks, (fw for fw, _ in records), n, np.int16)
+        file = _codes(paths, (r["file"] for _, r in records), n)
+        klass = _codes(names, (r["class"] for _, r in records), n)
+        func = _codes(names, (r["func"] for _, r in records), n)
+        lineno = np.fromiter((r["lineno"] if r["lineno"] is not None else -1 for _, r in records),
+                             dtype=np.int32, count=n)
+        score = np.fromiter((r["score"] for _, r in records), dtype=np.int16, count=n)
+
+        rows: List[int] = []
+        cols: List[int] = []
+        for i, (_, r) in enumerate(records):
+            for tag in r["tags"]:
+                rows.append(i)
+                cols.append(tag_names.code(tag))
+        tags = np.zeros((n, len(tag_names)), dtype=bool)
+        tags[rows, cols] = True
+
+        sink_columns = {c: j for j, c in enumerate(SINK_CATEGORIES)}
+        sinks = np.zeros((n, len(SINK_CATEGORIES)), dtype=bool)
+        for i, (_, r) in enumerate(records):
+            for category in r["sinks"]:
+                sinks[i, sink_columns[category]] = True
+        return cls(frameworks, paths, names, tag_names, framework, file, klass, func, lineno, score, tags, sinks)
+
+    def _framework_mask(self, framework: Optional[str]) -> np.ndarray:
+        if framework is None:
+            return np.ones(len(self), dtype=bool)
+        code = self.frameworks.index.get(framework)
+        return self.framework == (code if code is not None else -1)
+
+    def trigger_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.framework, minlength=len(self.frameworks))
+        return _per_code(self.frameworks, counts)
+
+    def tag_counts(self, framework: str = None) -> Dict[str, int]:
+        counts = self.tags[self._framework_mask(framework)].sum(axis=0)
+        return _per_code(self.tag_names, counts)
+
+    def sink_counts(self, framework: str = None) -> Dict[str, int]:
+        counts = self.sinks[self._framework_mask(framework)].sum(axis=0)
+        return {c: int(counts[j]) for j, c in enumerate(SINK_CATEGORIES)}
+
+    def score_buckets(self, bins: Sequence[int] = SCORE_BUCKETS_DEFAULT) -> Dict[str, Dict[str, int]]:
+        """Per framework counts of scores in [bins[i], bins[i+1]), the last bucket open-ended."""
+        edges = np.asarray(bins)
+        bucket = np.clip(np.digitize(self.score, edges) - 1, 0, len(edges) - 1)
+        nf, nb = len(self.frameworks), len(edges)
+        grid = np.bincount(self.framework.astype(np.int64) * nb + bucket, minlength=nf * nb).reshape(nf, nb)
+        labels = [f"{lo}-{hi - 1}" if hi - 1 > lo else f"{lo}" for lo, hi in zip(edges[:-1], edges[1:])]
+        labels.append(f"{edges[-1]}+")
+        return {self.frameworks.values[f]: dict(zip(labels, grid[f].tolist())) for f in range(nf)}
+
+    def _row_keys(self, framework, file, cls, func) -> np.ndarray:
+        # one int64 per (framework, file, class, func) code tuple
+        dims = (len(self.frameworks), len(self.paths), len(self.names), len(self.names))
+        return np.ravel_multi_index((framework, file, cls, func), dims)
+
+    def mark_overprivileged(self, entries: Iterable[Tuple[str, str, Optional[str], str]]):
+        """
+        Flag the rows of validated (framework, file, class, func) entries, so a
+        file scanned under two frameworks is flagged only where it was validated.
+        """
+        lookups = (self.frameworks.index, self.paths.index, self.names.index, self.names.index)
+        codes = [c for c in (tuple(index.get(v) for index, v in zip(lookups, entry)) for entry in entries)
+                 if None not in c]
+        if not codes or not len(self):
+            return
+        wanted = self._row_keys(*np.array(codes, dtype=np.int64).T)
+        self.overprivileged |= np.isin(self._row_keys(self.framework, self.file, self.cls, self.func), wanted)
+
+    def overprivilege_ratio(self) -> Dict[str, float]:
+        total = np.bincount(self.framework, minlength=len(self.frameworks))
+        flagged = np.bincount(self.framework, weights=self.overprivileged, minlength=len(self.frameworks))
+        ratio = np.divide(flagged, total, out=np.zeros(len(total)), where=total > 0)
+        return _per_code(self.frameworks, ratio)
+
+    def to_records(self) -> List[Dict]:
+        tag_values = self.tag_names.values
+        return [
+            {
+                "file": self.paths.values[self.file[i]],
+                "class": self.names.values[self.cls[i]],
+                "func": self.names.values[self.func[i]],
+                "lineno": int(self.lineno[i]) if self.lineno[i] >= 0 else None,
+                "score": int(self.score[i]),
+                "tags": [tag_values[t] for t in np.flatnonzero(self.tags[i])],
+                "sinks": [SINK_CATEGORIES[j] for j in np.flatnonzero(self.sinks[i])],
+            }
+            for i in range(len(self))
+        ]
+
+class FunctionTable:
+    """statistics.FunctionCollector records as NumPy columns for function enumeration."""
+    def __init__(self, frameworks: Categories, paths: Categories,
+                 framework: np.ndarray, file: np.ndarray, is_method: np.ndarray,
+                 is_nested: np.ndarray, is_property: np.ndarray, is_abstract: np.ndarray):
+        self.frameworks = frameworks
+        self.paths = paths
+        self.framework = framework
+        self.file = file
+        self.is_method = is_method
+        self.is_nested = is_nested
+        self.is_property = is_property
+        self.is_abstract = is_abstract
+
+    def __len__(self) -> int:
+        return len(self.file)
+
+    @classmethod
+    def from_scans(cls, scans: Dict[str, Iterable[Tuple[str, Sequence[Dict]]]]) -> "FunctionTable":
+        """Build from {framework: iterable of (path, FunctionCollector records)}."""
+        frameworks, paths = Categories(), Categories()
+        for fw in scans:
+            frameworks.code(fw)
+        rows = [(fw, path, r) for fw, found in scans.items() for path, rs in found for r in rs]
+        n = len(rows)
+        return cls(
+            frameworks, paths,
+            _codes(frameworks, (fw for fw, _, _ in rows), n, np.int16),
+            _codes(paths, (path for _, path, _ in rows), n),
+            np.fromiter((r["kind"] == "method" for _, _, r in rows), dtype=bool, count=n),
+            np.fromiter((r["is_nested"] for _, _, r in rows), dtype=bool, count=n),
+            np.fromiter((r["is_property"] for _, _, r in rows), dtype=bool, count=n),
+            np.fromiter((r["is_abstract"] for _, _, r in rows), dtype=bool, count=n),
+        )
+
+    def function_counts(self) -> Dict[str, int]:
+        return _per_code(self.frameworks, np.bincount(self.framework, minlength=len(self.frameworks)))
+
+    def method_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.framework, weights=self.is_method, minlength=len(self.frameworks))
+        return {k: int(v) for k, v in _per_code(self.frameworks, counts).items()}
+
+    def abstract_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.framework, weights=self.is_abstract, minlength=len(self.frameworks))
+        return {k: int(v) for k, v in _per_code(self.frameworks, counts).items()}
+
+    def files_with_functions(self) -> Dict[str, int]:
+        pairs = np.unique(self.framework.astype(np.int64) * max(len(self.paths), 1) + self.file)
+        counts = np.bincount(pairs // max(len(self.paths), 1), minlength=len(self.frameworks))
+        return _per_code(self.frameworks, counts)
+
+def trigger_table(frameworks: Dict[str, str], **scan_options) -> TriggerTable:
+    """TriggerTable over the memoized trigger scans of {framework: path}."""
+    et = load_event_trigger()
+    return TriggerTable.from_scans({
+        fw: et.get_trigger_scan(path, fw, **scan_options).triggers for fw, path in frameworks.items()
+    })
+
+def function_table(frameworks: Dict[str, str], mode: str = "public", **scan_options) -> FunctionTable:
+    extract = functools.partial(collect_functions, **mode_options(mode))
+    return FunctionTable.from_scans({
+        fw: ((path, found["functions"]) for path, found in iter_scan(repo, {"functions": extract}, **scan_options))
+        for fw, repo in frameworks.items()
+    })
+
+def readme_metrics(triggers: TriggerTable, functions: FunctionTable) -> Dict[str, Dict[str, float]]:
+    """Per framework function enumeration, trigger count and over-privilege ratio."""
+    counts = functions.function_counts()
+    trigger_counts = triggers.trigger_counts()
+    ratios = triggers.overprivilege_ratio()
+    names = list(dict.fromkeys(list(counts) + list(trigger_counts)))
+    return {
+        fw: {
+            "functions": counts.get(fw, 0),
+            "triggers": trigger_counts.get(fw, 0),
+            "overprivilege_ratio": ratios.get(fw, 0.0),
+        }
+        for fw in names
+    }
@@ -0,0 +1,139 @@
+import json
+import socket
+from urllib.parse import urlencode, urlsplit
+from typing import Any, Callable, Dict, List
+
+from audit_harness import current_method
+
+# requests.Session.request parameters after (method, url), for positional calls
+REQUEST_PARAMS = ["params", "data", "headers", "cookies", "files", "auth", "timeout", "allow_redirects",
+                  "proxies", "hooks", "stream", "verify", "cert", "json"]
+
+# what the old Flask receiver (api.py) answered
+FAKE_RESPONSE_BODY = b'{"status": "success"}'
+
+def _payload(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Size in bytes and top-level field names of a request body, without sending it."""
+    if kwargs.get("json") is not None:
+        body = kwargs["json"]
+        size = len(json.dumps(body, default=str).encode("utf-8"))
+    else:
+        body = kwargs.get("data")
+        if isinstance(body, dict):
+            size = len(urlencode(body, doseq=True).encode("utf-8"))
+        elif isinstance(body, str):
+            size = len(body.encode("utf-8"))
+        elif isinstance(body, (bytes, bytearray)):
+            size = len(body)
+        else:
+            size = 0
+    fields = list(body) if isinstance(body, dict) else []
+    files = kwargs.get("files")
+    if isinstance(files, dict):
+        fields += [f"file:{name}" for name in files]
+    return {"bytes": size, "fields": fields}
+
+def _address(address: Any) -> str:
+    if isinstance(address, tuple) and len(address) >= 2:
+        return f"{address[0]}:{address[1]}"
+    return str(address)
+
+class EgressRecorder:
+    """
+    Intercepts outbound traffic in this process while active. requests calls
+    are answered with a canned 200 response; raw socket connects, sends and
+    name lookups fail as if the network were down. Every attempt is kept in
+    `records` as {"method", "kind", "destination", ...}, where method is the
+    handler method audit_harness is attributing to, if any. Nothing leaves
+    the process, so validation runs need no receiver server or free port and
+    can run in parallel.
+
+        with EgressRecorder() as egress:
+            run_handler(handler)
+        egress.records
+    """
+    def __init__(self):
+        self.records: List[Dict] = []
+        self._saved: List[tuple] = []
+
+    def _record(self, kind: str, destination: str, **details):
+        self.records.append({"method": current_method(), "kind": kind, "destination": destination, **details})
+
+    def _patch(self, owner: Any, name: str, replacement: Callable):
+        self._saved.append((owner, name, owner.__dict__.get(name)))
+        setattr(owner, name, replacement)
+
+    def _blocked(self, destination: str) -> OSError:
+        return ConnectionRefusedError(f"egress to {destination} intercepted by ThreatForge")
+
+    def __enter__(self) -> "EgressRecorder":
+        recorder = self
+
+        def connect(sock, address):
+            destination = _address(address)
+            recorder._record("socket", destination, operation="connect")
+            raise recorder._blocked(destination)
+
+        def connect_ex(sock, address):
+            recorder._record("socket", _address(address), operation="connect")
+            return 111  # ECONNREFUSED
+
+        def sendto(sock, data, *args):
+            destination = _address(args[-1]) if args else "?"
+            recorder._record("socket", destination, operation="sendto", bytes=len(data))
+            raise recorder._blocked(destination)
+
+        def getaddrinfo(host, port, *args, **kwargs):
+            recorder._record("dns", _address((host, port)), operation="getaddrinfo")
+            raise socket.gaierror(socket.EAI_NONAME, "name resolution intercepted by ThreatForge")
+
+        self._patch(socket.socket, "connect", connect)
+        self._patch(socket.socket, "connect_ex", connect_ex)
+        self._patch(socket.socket, "sendto", sendto)
+        self._patch(socket, "getaddrinfo", getaddrinfo)
+        self._patch_requests()
+        return self
+
+    def _patch_requests(self):
+        try:
+            import requests
+        except ImportError:
+            return
+        recorder = self
+
+        def request(session, method, url, *args, **kwargs):
+            kwargs.update(zip(REQUEST_PARAMS, args))
+            recorder._record("http", url, http_method=str(method).upper(), host=urlsplit(str(url)).netloc,
+                             **_payload(kwargs))
+            response = requests.Response()
+            response.status_code = 200
+            response.reason = "OK"
+            response.url = url
+            response.encoding = "utf-8"
+            response.headers["Content-Type"] = "application/json"
+            response._content = FAKE_RESPONSE_BODY
+            return response
+
+        self._patch(requests.Session, "request", request)
+
+    def __exit__(self, *exc):
+        while self._saved:
+            owner, name, original = self._saved.pop()
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+
+    def destinations(self) -> List[str]:
+        return sorted({r["destination"] for r in self.records})
+
+def egress_summary(records: List[Dict]) -> Dict[str, Any]:
+    """Per-destination attempt counts and bytes, plus every payload field seen."""
+    by_destination: Dict[str, Dict[str, int]] = {}
+    fields: Dict[str, None] = {}
+    for r in records:
+        entry = by_destination.setdefault(r["destination"], {"attempts": 0, "bytes": 0})
+        entry["attempts"] += 1
+        entry["bytes"] += r.get("bytes", 0)
+        fields.update(dict.fromkeys(r.get("fields", ())))
+    return {"destinations": by_destination, "fields": list(fields)}
@@ -1,25 +1,36 @@
 import os
+import re
 import ast
-from typing import List, Dict, Tuple, Set, Optional
+import contextlib
+import functools
+import heapq
+from time import perf_counter
+from collections import Counter
+from concurrent.futures import Executor
+from typing import List, Dict, Tuple, Set, Optional, FrozenSet, Iterator, Iterable, Pattern, Sequence
 
-EXCLUDE_DIRS_DEFAULT = {
-    "tests", "__pycache__", "venv", "examples", "docs", "site-packages",
-    "build", "dist", ".tox", ".mypy_cache", ".pytest_cache", ".venv", "notebooks", "scripts"
-}
+from class_index import ClassIndex, collect_class_defs
+from rules import EVENT_PREFIX, FrameworkRules, RuleEngine, load_rules
+from scan_cache import ScanCache
+from scan_profile import active_profiler, profile_from_env
+from scanner import EXCLUDE_DIRS_DEFAULT, iter_scan, iter_scan_sources, iter_scan_versions, process_pool
+from sinks import function_sinks, import_aliases
+from statistics import collect_functions, function_features, mode_options
 
-CALLBACK_CLASS_HINTS = {"callback", "handler", "observer", "hook", "event", "listener"}
+# bump whenever scoring or trigger records change so cached scans are dropped
+EXTRACTOR_VERSION = 6
 
+CALLBACK_CLASS_HINTS = {"callback", "handler", "observer", "hook", "event", "listener"}
 
-FRAMEWORK_EVENT_TOKENS = {
-    "LangChain": {"llm", "chain", "tool", "agent", "retriever", "chat", "embed", "run"},
-    "LlamaIndex": {"llm", "query", "retriever", "node", "chunk", "ingest", "run", "event"},
-    "SemanticKernel": {"function", "skill", "planner", "prompt", "invoke", "run"},
-    "AutoGPT": {"agent", "task", "message", "response", "plan", "tool", "run"},
-    "CrewAI": {"agent", "task", "crew", "process", "tool", "run"},
-}
+# _score_event_method only accepts names starting with "on_", so a file without
+# a `def on_` (async or not, possibly split by a line continuation) cannot yield
+# a trigger and is skipped before decoding and parsing
+TRIGGER_PREFILTER = re.compile(rb"def(?:\s|\\\r?\n)+on_")
 
-COMMON_PARAM_HINTS = {"run_id", "parent_run_id", "tags", "metadata", "traced", "span"}
-LLAMAINDEX_PARAM_HINTS = {"event_type", "payload", "event_id", "node_id"}
+# statements whose bodies can hold a def; TriggerCollector enters nothing else
+_DEF_HOLDERS = tuple(getattr(ast, name) for name in (
+    "FunctionDef", "AsyncFunctionDef", "ClassDef", "If", "For", "AsyncFor", "While", "With", "AsyncWith",
+    "Try", "TryStar", "ExceptHandler", "Match", "match_case") if hasattr(ast, name))
 
 def _is_py_file(file: str) -> bool:
     return file.endswith(".py")
@@ -48,18 +59,7 @@ def _looks_like_callback_class(node: ast.ClassDef) -> bool:
 def _get_arg_names(fn: ast.AST) -> Set[str]:
     if not isinstance(fn, (ast.FunctionDef, ast.AsyncFunctionDef)):
         return set()
-    args = []
-    if fn.args.posonlyargs:
-        args.extend(a.arg for a in fn.args.posonlyargs)
-    if fn.args.args:
-        args.extend(a.arg for a in fn.args.args)
-    if fn.args.kwonlyargs:
-        args.extend(a.arg for a in fn.args.kwonlyargs)
-    if fn.args.vararg:
-        args.append(fn.args.vararg.arg)
-    if fn.args.kwarg:
-        args.append(fn.args.kwarg.arg)
-    return set(args)
+    return function_features(fn).arg_names
 
 def _decorator_names(fn: ast.AST) -> Set[str]:
     names = set()
@@ -97,143 +97,471 @@ def _class_name_stack(stack: List[ast.AST]) -> Optional[str]:
             return n.name
     return None
 
-def _score_event_method(framework: str, fn_name: str, argnames: Set[str], in_callback_class: bool) -> Tuple[int, List[str]]:
-    score = 0
-    tags = []
-    if not fn_name.startswith("on_"):
-        return -1, tags
+def _class_qualname(stack: List[ast.AST]) -> Optional[str]:
+    # dotted name of the innermost class as class_index records it; None inside a function
+    names = []
+    for n in stack:
+        if not isinstance(n, ast.ClassDef):
+            return None
+        names.append(n.name)
+    return ".".join(names) or None
 
-    score += 1
-    tags.append("on_prefix")
+def _score_event_method(framework: str, fn_name: str, argnames: Set[str], in_callback_class: bool,
+                        rules: RuleEngine = None) -> Tuple[int, List[str]]:
+    # scoring rules live in rules.json, see rules.py
+    return (rules or load_rules()).score(framework, fn_name, argnames, in_callback_class)
 
-    if in_callback_class:
-        score += 2
-        tags.append("callback_class")
+class TriggerCollector(ast.NodeVisitor):
+    """
+    Score every on_* function of a module. Methods are scored once with their
+    class context and once more as plain functions when the walk reaches them.
+    Each record lists the sink categories its body reaches (see sinks.py).
+    Records are kept whatever their score: the threshold applies to the final
+    score, after any class index adjustment, see trigger_records. "qualname"
+    is the method's dotted class path within the module, the key ClassIndex
+    looks classes up by.
+    """
+    def __init__(self, framework_name: str, aliases: Dict[str, str] = None, rules: RuleEngine = None):
+        self.framework_name = framework_name
+        self.rules = (rules or load_rules()).for_framework(framework_name)
+        self.aliases = aliases if aliases is not None else {}
+        self.stack: List[ast.AST] = []
+        self.records: List[Dict] = []
+        self.profiler = active_profiler()
 
-    for tok in FRAMEWORK_EVENT_TOKENS.get(framework, set()):
-        if tok in fn_name:
-            score += 1
-            tags.append(f"name:{tok}")
+    def _record(self, cls: Optional[str], fn: ast.AST, in_callback_class: bool, qualname: Optional[str] = None):
+        fn_name = fn.name  # type: ignore[attr-defined]
+        if not fn_name.startswith(EVENT_PREFIX):
+            # scores -1 whatever the arguments
+            return
+        argnames = _get_arg_names(fn)
+        if self.profiler is None:
+            score, tags = self.rules.score(fn_name, argnames, in_callback_class)
+        else:
+            start = perf_counter()
+            score, tags = self.rules.score(fn_name, argnames, in_callback_class)
+            self.profiler.add("score", perf_counter() - start)
+        if score >= 0:
+            self.records.append({
+                "class": cls,
+                "qualname": qualname,
+                "func": fn_name,
+                "lineno": getattr(fn, "lineno", None),
+                "score": score,
+                "tags": tags,
+                "sinks": function_sinks(fn, self.aliases),
+            })
 
-    if argnames & COMMON_PARAM_HINTS:
-        score += 1
-        tags.append("common_params")
-    if argnames & LLAMAINDEX_PARAM_HINTS:
-        score += 1
-        tags.append("llamaindex_params")
+    def generic_visit(self, node: ast.AST):
+        # a def is always a statement, so only the statement lists of compound
+        # statements can hold one; expressions and simple statements are skipped
+        for field in ("body", "orelse", "finalbody", "handlers", "cases"):
+            children = getattr(node, field, None)
+            if isinstance(children, list):
+                for child in children:
+                    if isinstance(child, _DEF_HOLDERS):
+                        self.visit(child)
 
-    return score, tags
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.stack.append(node)
+        in_cb = _looks_like_callback_class(node)
+        qualname = _class_qualname(self.stack)
+        for b in node.body:
+            if isinstance(b, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._record(node.name, b, in_cb, qualname)
+        self.generic_visit(node)
+        self.stack.pop()
 
-def find_event_triggers_in_repo(repo_path: str, framework_name: str,
-                                exclude_dirs: Set[str] = None) -> List[Dict]:
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self._record(None, node, in_callback_class=False)
+        self.stack.append(node)
+        self.generic_visit(node)
+        self.stack.pop()
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
+        self._record(None, node, in_callback_class=False)
+        self.stack.append(node)
+        self.generic_visit(node)
+        self.stack.pop()
+
+def collect_triggers(tree: ast.AST, framework_name: str, rules: RuleEngine = None) -> List[Dict]:
+    visitor = TriggerCollector(framework_name, import_aliases(tree), rules)
+    visitor.visit(tree)
+    return visitor.records
+
+def _trigger_extractor(framework_name: str, rules: RuleEngine = None) -> functools.partial:
+    # rules are always bound so their digest is part of the scan cache key
+    return functools.partial(collect_triggers, framework_name=framework_name, rules=rules or load_rules())
+
+def build_class_index(repo_path: str,
+                      exclude_dirs: Set[str] = None,
+                      jobs: int = 1,
+                      executor: Executor = None,
+                      cache: ScanCache = None) -> ClassIndex:
+    """Repo-wide ClassIndex flagging transitive subclasses of callback classes."""
     if exclude_dirs is None:
         exclude_dirs = set(EXCLUDE_DIRS_DEFAULT)
+    return ClassIndex.from_repo(repo_path, CALLBACK_CLASS_HINTS, exclude_dirs,
+                                jobs=jobs, executor=executor, cache=cache)
+
+def _apply_class_index(r: Dict, class_index: ClassIndex, weight: int) -> Dict:
+    # score a method of an indirect callback class as if it had been flagged locally
+    if r["class"] is None or "callback_class" in r["tags"]:
+        return r
+    if r["qualname"] is None or not class_index.is_callback_class(r["file"], r["qualname"]):
+        return r
+    return {**r, "score": r["score"] + weight, "tags": r["tags"][:1] + ["callback_class"] + r["tags"][1:]}
+
+def trigger_records(path: str, found: Iterable[Dict], rules: FrameworkRules,
+                    class_index: ClassIndex = None) -> Iterator[Dict]:
+    """The collect_triggers records of path that reach the threshold, scored with class_index if given."""
+    weight = rules.weights["callback_class"]
+    for r in found:
+        r = {"file": path, **r}
+        if class_index is not None:
+            r = _apply_class_index(r, class_index, weight)
+        if r["score"] >= rules.threshold:
+            yield r
+
+def _framework_rules(extractor: functools.partial) -> FrameworkRules:
+    return extractor.keywords["rules"].for_framework(extractor.keywords["framework_name"])
+
+def _trigger_sort_key(r: Dict):
+    return (-r["score"], r["file"], r["lineno"] or 0)
+
+def sort_triggers(results: List[Dict]):
+    results.sort(key=_trigger_sort_key)
+
+def _trigger_prefilter(enabled: bool) -> Optional[Pattern[bytes]]:
+    return TRIGGER_PREFILTER if enabled else None
+
+def _hierarchy_records(scans: List[Tuple[str, List[Dict], List[Dict]]], rules: FrameworkRules) -> Iterator[Dict]:
+    # (path, class records, raw trigger records) of a whole tree, in any order;
+    # completion order varies from run to run, the index must not
+    scans.sort(key=lambda scan: scan[0])
+    class_index = ClassIndex(((path, classes) for path, classes, _ in scans), CALLBACK_CLASS_HINTS)
+    for path, _, triggers in scans:
+        yield from trigger_records(path, triggers, rules, class_index)
 
+def iter_event_triggers(repo_path: str, framework_name: str,
+                        exclude_dirs: Set[str] = None,
+                        jobs: int = 1,
+                        executor: Executor = None,
+                        cache: ScanCache = None,
+                        prefilter: bool = True,
+                        stats: Counter = None,
+                        class_index: ClassIndex = None,
+                        rules: RuleEngine = None,
+                        hierarchy: bool = False) -> Iterator[Dict]:
+    """
+    Yield trigger records file by file as the scan proceeds, unsorted. Nothing
+    is accumulated here, and a pool keeps at most
+    scanner.INFLIGHT_PER_WORKER files per worker in flight.
+
+    prefilter=False parses every file, to cross-check that TRIGGER_PREFILTER
+    drops no trigger; stats receives the "files" and "prefilter_skipped" counts.
+
+    With a class_index (see build_class_index) methods of classes that only
+    inherit from a callback class through other classes score as callback
+    class methods too. hierarchy=True builds that index in the same scan: every
+    file is then parsed, whatever the prefilter, and the raw records are held
+    until the walk ends, since no score is final before the index is.
+
+    rules defaults to load_rules(), see rules.py.
+    """
+    if exclude_dirs is None:
+        exclude_dirs = set(EXCLUDE_DIRS_DEFAULT)
+
+    extractor = _trigger_extractor(framework_name, rules)
+    if hierarchy and class_index is None:
+        extractors = {"triggers": extractor, "classes": collect_class_defs}
+        scans = [(path, found["classes"], found["triggers"])
+                 for path, found in iter_scan(repo_path, extractors, exclude_dirs, jobs=jobs, executor=executor,
+                                              cache=cache, ordered=False, stats=stats)]
+        yield from _hierarchy_records(scans, _framework_rules(extractor))
+        return
+
+    extractors = {"triggers": extractor}
+    for path, found in iter_scan(repo_path, extractors, exclude_dirs,
+                                 jobs=jobs, executor=executor, cache=cache, ordered=False,
+                                 prefilter=_trigger_prefilter(prefilter), stats=stats):
+        yield from trigger_records(path, found["triggers"], _framework_rules(extractor), class_index)
+
+def find_event_triggers_in_repo(repo_path: str, framework_name: str,
+                                exclude_dirs: Set[str] = None,
+                                jobs: int = 1,
+                                executor: Executor = None,
+                                cache: ScanCache = None,
+                                prefilter: bool = True,
+                                stats: Counter = None,
+                                class_index: ClassIndex = None,
+                                rules: RuleEngine = None,
+                                hierarchy: bool = False) -> List[Dict]:
+    results = list(iter_event_triggers(repo_path, framework_name, exclude_dirs,
+                                       jobs=jobs, executor=executor, cache=cache,
+                                       prefilter=prefilter, stats=stats, class_index=class_index,
+                                       rules=rules, hierarchy=hierarchy))
+    sort_triggers(results)
+    return results
+
+def find_event_triggers_in_sources(sources: Iterable[Tuple[str, bytes]], framework_name: str,
+                                   cache: ScanCache = None,
+                                   prefilter: bool = True,
+                                   stats: Counter = None,
+                                   rules: RuleEngine = None) -> List[Dict]:
+    """
+    find_event_triggers_in_repo over (path, bytes) pairs that are already
+    filtered, e.g. blobs read from a git revision.
+    """
+    extractor = _trigger_extractor(framework_name, rules)
+    extractors = {"triggers": extractor}
     results: List[Dict] = []
+    for path, found in iter_scan_sources(sources, extractors, cache=cache,
+                                         prefilter=_trigger_prefilter(prefilter), stats=stats):
+        results.extend(trigger_records(path, found["triggers"], _framework_rules(extractor)))
+    sort_triggers(results)
+    return results
 
-    for root, dirs, files in os.walk(repo_path):
-        dirs[:] = [d for d in dirs if d not in exclude_dirs and not d.startswith(".")]
-        for file in files:
-            if not _is_py_file(file):
-                continue
-            if file.startswith("test_") or file.endswith("_test.py") or file == "conftest.py":
-                continue
-
-            path = os.path.join(root, file)
-            try:
-                with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                    src = f.read()
-                tree = ast.parse(src)
-            except Exception as e:
-                print(f"[WARN] Parse failed {path}: {e}")
-                continue
-
-            stack: List[ast.AST] = []
-
-            class Visitor(ast.NodeVisitor):
-                def visit_ClassDef(self, node: ast.ClassDef):
-                    stack.append(node)
-                    in_cb = _looks_like_callback_class(node)
-                    for b in node.body:
-                        if isinstance(b, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                            fn = b
-                            fn_name = fn.name
-                            argnames = _get_arg_names(fn)
-                            score, tags = _score_event_method(framework_name, fn_name, argnames, in_cb)
-                            if score >= 1:
-                                results.append({
-                                    "file": path,
-                                    "class": node.name,
-                                    "func": fn_name,
-                                    "lineno": getattr(fn, "lineno", None),
-                                    "score": score,
-                                    "tags": tags
-                                })
-                    self.generic_visit(node)
-                    stack.pop()
-
-                def visit_FunctionDef(self, node: ast.FunctionDef):
-                    fn_name = node.name
-                    argnames = _get_arg_names(node)
-                    score, tags = _score_event_method(framework_name, fn_name, argnames, in_callback_class=False)
-                    if score >= 1:
-                        results.append({
-                            "file": path,
-                            "class": None,
-                            "func": fn_name,
-                            "lineno": getattr(node, "lineno", None),
-                            "score": score,
-                            "tags": tags
-                        })
-                    self.generic_visit(node)
-
-                def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
-                    fn_name = node.name
-                    argnames = _get_arg_names(node)
-                    score, tags = _score_event_method(framework_name, fn_name, argnames, in_callback_class=False)
-                    if score >= 1:
-                        results.append({
-                            "file": path,
-                            "class": None,
-                            "func": fn_name,
-                            "lineno": getattr(node, "lineno", None),
-                            "score": score,
-                            "tags": tags
-                        })
-                    self.generic_visit(node)
-
-            Visitor().visit(tree)
-
-    results.sort(key=lambda r: (-r["score"], r["file"], r["lineno"] or 0))
+def find_event_triggers_in_versions(versions: Dict[str, str], framework_name: str,
+                                    exclude_dirs: Set[str] = None,
+                                    jobs: int = 1,
+                                    executor: Executor = None,
+                                    cache: ScanCache = None,
+                                    prefilter: bool = True,
+                                    stats: Counter = None,
+                                    rules: RuleEngine = None) -> Dict[str, List[Dict]]:
+    """
+    find_event_triggers_in_repo for each of several releases or vendored
+    copies of one framework ({label: tree or archive}), scoring every
+    distinct file content once; see scanner.iter_scan_versions.
+    """
+    if exclude_dirs is None:
+        exclude_dirs = set(EXCLUDE_DIRS_DEFAULT)
+
+    extractor = _trigger_extractor(framework_name, rules)
+    extractors = {"triggers": extractor}
+    results: Dict[str, List[Dict]] = {label: [] for label in versions}
+    for label, path, found in iter_scan_versions(versions, extractors, exclude_dirs,
+                                                 jobs=jobs, executor=executor, cache=cache,
+                                                 prefilter=_trigger_prefilter(prefilter), stats=stats):
+        results[label].extend(trigger_records(path, found["triggers"], _framework_rules(extractor)))
+    for triggers in results.values():
+        sort_triggers(triggers)
     return results
 
-def print_event_summary(frameworks: Dict[str, str], topk: int = 50):
+def top_event_triggers(repo_path: str, framework_name: str, k: int,
+                       exclude_dirs: Set[str] = None,
+                       jobs: int = 1,
+                       executor: Executor = None,
+                       cache: ScanCache = None,
+                       prefilter: bool = True,
+                       stats: Counter = None,
+                       class_index: ClassIndex = None,
+                       rules: RuleEngine = None,
+                       hierarchy: bool = False) -> Tuple[int, List[Dict]]:
+    """
+    Total trigger count and the first k records of the sorted trigger list,
+    kept in a bounded heap so memory does not grow with the repo (except for
+    the raw records a hierarchy=True scan holds, see iter_event_triggers).
+    """
+    count = 0
+
+    def counted():
+        nonlocal count
+        for r in iter_event_triggers(repo_path, framework_name, exclude_dirs,
+                                     jobs=jobs, executor=executor, cache=cache,
+                                     prefilter=prefilter, stats=stats, class_index=class_index,
+                                     rules=rules, hierarchy=hierarchy):
+            count += 1
+            yield r
+
+    # heapq.nsmallest is equivalent to sorted(...)[:k], ties included
+    top = heapq.nsmallest(k, counted(), key=_trigger_sort_key)
+    return count, top
+
+def scan_framework(repo_path: str, framework_name: str,
+                   exclude_dirs: Set[str] = None,
+                   mode: str = "public",
+                   jobs: int = 1,
+                   executor: Executor = None,
+                   cache: ScanCache = None,
+                   rules: RuleEngine = None,
+                   modes: Sequence[str] = (),
+                   hierarchy: bool = False,
+                   stats: Counter = None) -> Dict:
+    """
+    One walk and one parse per file feeding both the trigger scoring and the
+    statistics.FunctionCollector count for the given counting mode, plus
+    "counts": {mode: (functions, files)} for mode and each of modes.
+    hierarchy=True scores transitive callback subclasses as
+    iter_event_triggers does, from the same parse.
+    """
+    if exclude_dirs is None:
+        exclude_dirs = set(EXCLUDE_DIRS_DEFAULT)
+
+    extractor = _trigger_extractor(framework_name, rules)
+    modes = list(dict.fromkeys((mode, *modes)))
+    extractors = {"triggers": extractor}
+    extractors.update({f"functions:{m}": functools.partial(collect_functions, **mode_options(m)) for m in modes})
+    if hierarchy:
+        extractors["classes"] = collect_class_defs
+    triggers: List[Dict] = []
+    scans = []
+    function_counts = dict.fromkeys(modes, 0)
+    file_count = 0
+    for path, found in iter_scan(repo_path, extractors, exclude_dirs,
+                                 jobs=jobs, executor=executor, cache=cache, ordered=False, stats=stats):
+        if hierarchy:
+            scans.append((path, found["classes"], found["triggers"]))
+        else:
+            triggers.extend(trigger_records(path, found["triggers"], _framework_rules(extractor)))
+        for m in modes:
+            function_counts[m] += len(found[f"functions:{m}"])
+        file_count += 1
+    if hierarchy:
+        triggers.extend(_hierarchy_records(scans, _framework_rules(extractor)))
+
+    sort_triggers(triggers)
+    return {"triggers": triggers, "functions": function_counts[mode], "files": file_count,
+            "counts": {m: (function_counts[m], file_count) for m in modes}}
+
+def _format_example(r: Dict) -> str:
+    loc = f"{os.path.basename(r['file'])}:{r['lineno']}"
+    cls = f"{r['class']+'.' if r['class'] else ''}"
+    return f"{cls}{r['func']}@{loc}"
+
+class TriggerScanResult:
+    """
+    Trigger records of one framework tree. The console summary and the TSV
+    writer are both views over this one object.
+    """
+    def __init__(self, framework: str, repo_path: str, triggers: List[Dict], stats: Counter = None):
+        self.framework = framework
+        self.repo_path = repo_path
+        self.triggers = triggers
+        self.stats = stats if stats is not None else Counter()
+
+    def __len__(self) -> int:
+        return len(self.triggers)
+
+    def top(self, k: int) -> List[Dict]:
+        return self.triggers[:k]
+
+    def examples(self, topk: int = 50, n: int = 3) -> List[str]:
+        return [_format_example(r) for r in self.top(topk)[:n]]
+
+    def reaching_sinks(self, categories: Iterable[str] = None) -> List[Dict]:
+        """Triggers whose body reaches any of the sink categories (default: any sink), for dynamic validation."""
+        if categories is None:
+            return [r for r in self.triggers if r["sinks"]]
+        wanted = set(categories)
+        return [r for r in self.triggers if wanted.intersection(r["sinks"])]
+
+    def tsv_rows(self) -> List[List]:
+        return [
+            [self.framework, r["file"], r["class"] or "", r["func"], r["lineno"] or "", r["score"], ",".join(r["tags"]),
+             ",".join(r["sinks"])]
+            for r in self.triggers
+        ]
+
+_SCAN_RESULTS: Dict[Tuple[str, str, FrozenSet[str], bool, bool, str], TriggerScanResult] = {}
+
+def get_trigger_scan(repo_path: str, framework_name: str,
+                     exclude_dirs: Set[str] = None,
+                     jobs: int = 1,
+                     executor: Executor = None,
+                     cache: ScanCache = None,
+                     refresh: bool = False,
+                     prefilter: bool = True,
+                     hierarchy: bool = False,
+                     rules: RuleEngine = None) -> TriggerScanResult:
+    """
+    Memoized find_event_triggers_in_repo: one scan per (path, framework,
+    exclude set, prefilter, hierarchy, rules) for the lifetime of the process
+    unless refresh is set. hierarchy=True builds the repo's ClassIndex in the
+    same scan so indirect callback subclasses are scored as callback classes.
+    """
+    if exclude_dirs is None:
+        exclude_dirs = set(EXCLUDE_DIRS_DEFAULT)
+    rules = rules or load_rules()
+    key = (os.path.abspath(repo_path), framework_name, frozenset(exclude_dirs), prefilter, hierarchy, rules.digest)
+    result = _SCAN_RESULTS.get(key)
+    if result is None or refresh:
+        stats = Counter()
+        triggers = find_event_triggers_in_repo(repo_path, framework_name, exclude_dirs,
+                                               jobs=jobs, executor=executor, cache=cache,
+                                               prefilter=prefilter, stats=stats, rules=rules,
+                                               hierarchy=hierarchy)
+        result = _SCAN_RESULTS[key] = TriggerScanResult(framework_name, repo_path, triggers, stats)
+    return result
+
+def clear_trigger_scans():
+    _SCAN_RESULTS.clear()
+
+def _framework_pool(jobs: int, executor: Executor = None):
+    # one pool shared by all frameworks instead of one per scan; a caller's executor takes precedence
+    if executor is not None:
+        return contextlib.nullcontext(executor)
+    return process_pool(jobs) if jobs > 1 else contextlib.nullcontext()
+
+def print_event_summary(frameworks: Dict[str, str], topk: int = 50, jobs: int = 1,
+                        cache: ScanCache = None, stream: bool = False, hierarchy: bool = False,
+                        rules: RuleEngine = None, executor: Executor = None):
+    """
+    stream=True keeps only a bounded top-k heap per framework instead of the
+    memoized full result, for inputs too large to hold in memory.
+    hierarchy=True scores transitive callback subclasses, see get_trigger_scan.
+    executor replaces the pool of `jobs` workers, to share one across reports.
+    """
 
     header = f"{'Framework':<15} | {'Count':<5} | {'Top examples':<60}"
     print(header)
     print("-" * len(header))
-    for fw, path in frameworks.items():
-        res = find_event_triggers_in_repo(path, fw, exclude_dirs=EXCLUDE_DIRS_DEFAULT)
-        top = res[:topk]
-        examples = []
-        for r in top[:3]:
-            loc = f"{os.path.basename(r['file'])}:{r['lineno']}"
-            cls = f"{r['class']+'.' if r['class'] else ''}"
-            examples.append(f"{cls}{r['func']}@{loc}")
-        print(f"{fw:<15} | {len(res):<5} | {('; '.join(examples)):<60}")
-
-def save_event_details(frameworks: Dict[str, str], outfile: str = "event_triggers.tsv"):
+    scan_stats = {}
+    with _framework_pool(jobs, executor) as pool:
+        for fw, path in frameworks.items():
+            if stream:
+                stats = Counter()
+                count, top = top_event_triggers(path, fw, min(topk, 3), exclude_dirs=EXCLUDE_DIRS_DEFAULT,
+                                                executor=pool, cache=cache, stats=stats, rules=rules,
+                                                hierarchy=hierarchy)
+                examples = [_format_example(r) for r in top]
+            else:
+                res = get_trigger_scan(path, fw, exclude_dirs=EXCLUDE_DIRS_DEFAULT, executor=pool, cache=cache,
+                                       hierarchy=hierarchy, rules=rules)
+                count, examples, stats = len(res), res.examples(topk), res.stats
+            print(f"{fw:<15} | {count:<5} | {('; '.join(examples)):<60}")
+            scan_stats[fw] = stats
+    for fw, stats in scan_stats.items():
+        print(f"[INFO] {fw}: prefilter skipped {stats['prefilter_skipped']} of {stats['files']} files")
+
+def save_event_details(frameworks: Dict[str, str], outfile: str = "event_triggers.tsv", jobs: int = 1,
+                       cache: ScanCache = None, hierarchy: bool = False, rules: RuleEngine = None,
+                       executor: Executor = None):
 
     import csv
     rows = []
-    for fw, path in frameworks.items():
-        res = find_event_triggers_in_repo(path, fw, exclude_dirs=EXCLUDE_DIRS_DEFAULT)
-        for r in res:
-            rows.append([
-                fw, r["file"], r["class"] or "", r["func"], r["lineno"] or "", r["score"], ",".join(r["tags"])
-            ])
+    with _framework_pool(jobs, executor) as pool:
+        for fw, path in frameworks.items():
+            res = get_trigger_scan(path, fw, exclude_dirs=EXCLUDE_DIRS_DEFAULT, executor=pool, cache=cache,
+                                   hierarchy=hierarchy, rules=rules)
+            rows.extend(res.tsv_rows())
     with open(outfile, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f, delimiter="\t")
-        writer.writerow(["framework", "file", "class", "func", "lineno", "score", "tags"])
+        writer.writerow(["framework", "file", "class", "func", "lineno", "score", "tags", "sinks"])
         writer.writerows(rows)
     print(f"[INFO] Saved details to {outfile}")
+
+if __name__ == "__main__":
+    frameworks = {
+        "LangChain": "langchain",
+        "LlamaIndex": "llama_index",
+        "SemanticKernel": "semantic-kernel/python",
+        "AutoGPT": "Auto-GPT",
+        "CrewAI": "crewAI",
+    }
+
+    # both reports read the same memoized scan of each framework
+    with profile_from_env():
+        print_event_summary(frameworks, hierarchy=True)
+        save_event_details(frameworks, hierarchy=True)
@@ -0,0 +1,156 @@
+import os
+import argparse
+import threading
+import subprocess
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from scan_cache import ScanCache
+from scanner import EXCLUDE_DIRS_DEFAULT, is_source_path, load_event_trigger
+
+def _git(repo_path: str, *args: str) -> bytes:
+    return subprocess.run(
+        ["git", "-C", repo_path, *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+    ).stdout
+
+def _split_z(out: bytes) -> List[str]:
+    return [p.decode("utf-8", errors="surrogateescape") for p in out.split(b"\0") if p]
+
+# repo_path may be a subdirectory of the work tree (e.g. semantic-kernel/python):
+# every git path below is relative to it, never to the work tree root
+
+def revision_files(repo_path: str, rev: str, exclude_dirs: Set[str] = None) -> List[str]:
+    """Source files of a revision under repo_path, filtered like a directory scan of its checkout."""
+    out = _git(repo_path, "ls-tree", "-r", "-z", "--name-only", rev)
+    return [p for p in _split_z(out) if is_source_path(p, exclude_dirs)]
+
+def changed_files(repo_path: str, old_rev: str, new_rev: str, exclude_dirs: Set[str] = None) -> Set[str]:
+    """Source files added, modified or deleted between two revisions; renames count as delete plus add."""
+    out = _git(repo_path, "diff", "--relative", "--name-only", "-z", "--no-renames", old_rev, new_rev)
+    return {p for p in _split_z(out) if is_source_path(p, exclude_dirs)}
+
+def read_blobs(repo_path: str, rev: str, relpaths: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Stream (path, bytes) for each relpath at rev through a single
+    `git cat-file --batch`, without touching the working tree. Paths are
+    yielded joined onto repo_path so records match a checkout scan.
+    """
+    relpaths = list(relpaths)
+    proc = subprocess.Popen(["git", "-C", repo_path, "cat-file", "--batch"],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def feed():
+        try:
+            for rel in relpaths:
+                # "./" resolves the path from repo_path rather than the work tree root
+                proc.stdin.write(f"{rev}:./{rel}\n".encode("utf-8", errors="surrogateescape"))
+            proc.stdin.close()
+        except BrokenPipeError:
+            # the reader stopped early and git exited
+            pass
+
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    try:
+        for rel in relpaths:
+            header = proc.stdout.readline().split()
+            if len(header) != 3 or not header[2].isdigit():
+                # "<object> missing", where the object name may hold spaces: deleted at this revision
+                continue
+            data = proc.stdout.read(int(header[2]))
+            proc.stdout.read(1)
+            if header[1] == b"blob":
+                yield os.path.join(repo_path, rel), data
+    finally:
+        proc.stdout.close()
+        writer.join()
+        proc.wait()
+
+def scan_revision(repo_path: str, framework_name: str, rev: str,
+                  exclude_dirs: Set[str] = None, cache: ScanCache = None) -> List[Dict]:
+    et = load_event_trigger()
+    files = revision_files(repo_path, rev, exclude_dirs)
+    return et.find_event_triggers_in_sources(read_blobs(repo_path, rev, files), framework_name, cache=cache)
+
+def _relpath(repo_path: str, path: str) -> str:
+    return os.path.relpath(path, repo_path).replace(os.sep, "/")
+
+def incremental_scan(repo_path: str, framework_name: str, old_rev: str, new_rev: str,
+                     previous: Optional[List[Dict]] = None,
+                     exclude_dirs: Set[str] = None,
+                     cache: ScanCache = None) -> Tuple[List[Dict], Dict[str, List]]:
+    """
+    Triggers at new_rev computed from the triggers at old_rev: records of
+    unchanged files are reused and only files changed between the two
+    revisions are read and parsed. `previous` is the old_rev result; it is
+    scanned once when not given.
+
+    Returns (triggers at new_rev, diff_triggers(previous, new)).
+    """
+    if exclude_dirs is None:
+        exclude_dirs = set(EXCLUDE_DIRS_DEFAULT)
+    if previous is None:
+        previous = scan_revision(repo_path, framework_name, old_rev, exclude_dirs, cache)
+
+    et = load_event_trigger()
+    changed = changed_files(repo_path, old_rev, new_rev, exclude_dirs)
+    kept = [r for r in previous if _relpath(repo_path, r["file"]) not in changed]
+    fresh = et.find_event_triggers_in_sources(read_blobs(repo_path, new_rev, sorted(changed)),
+                                              framework_name, cache=cache)
+    triggers = kept + fresh
+    et.sort_triggers(triggers)
+    return triggers, diff_triggers(previous, triggers)
+
+def _by_entry(triggers: List[Dict]) -> Dict[Tuple[str, Optional[str], str], Dict]:
+    # a method is scored once with its class and once more as a plain function;
+    # only the class record stands for it
+    methods = {(r["file"], r["func"], r["lineno"]) for r in triggers if r["class"] is not None}
+    entries = {}
+    for r in triggers:
+        if r["class"] is None and (r["file"], r["func"], r["lineno"]) in methods:
+            continue
+        key = (r["file"], r["class"], r["func"])
+        if key not in entries or r["score"] > entries[key]["score"]:
+            entries[key] = r
+    return entries
+
+def diff_triggers(old: List[Dict], new: List[Dict]) -> Dict[str, List]:
+    """
+    Compare two trigger lists by (file, class, func), ignoring line moves.
+    rescored holds (old record, new record) pairs whose score changed.
+    """
+    before, after = _by_entry(old), _by_entry(new)
+    return {
+        "added": [after[k] for k in sorted(after.keys() - before.keys(), key=str)],
+        "removed": [before[k] for k in sorted(before.keys() - after.keys(), key=str)],
+        "rescored": [(before[k], after[k]) for k in sorted(before.keys() & after.keys(), key=str)
+                     if before[k]["score"] != after[k]["score"]],
+    }
+
+def _entry_name(r: Dict) -> str:
+    return f"{r['class']+'.' if r['class'] else ''}{r['func']}"
+
+def print_trigger_diff(diff: Dict[str, List]):
+    for r in diff["added"]:
+        print(f"+ {_entry_name(r):<50} score={r['score']:<3} {r['file']}:{r['lineno']}")
+    for r in diff["removed"]:
+        print(f"- {_entry_name(r):<50} score={r['score']:<3} {r['file']}:{r['lineno']}")
+    for old, new in diff["rescored"]:
+        print(f"~ {_entry_name(new):<50} score={old['score']}->{new['score']:<3} {new['file']}:{new['lineno']}")
+    print(f"[INFO] added={len(diff['added'])} removed={len(diff['removed'])} rescored={len(diff['rescored'])}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trigger diff between two revisions of a framework checkout")
+    parser.add_argument("repo")
+    parser.add_argument("framework")
+    parser.add_argument("old_rev")
+    parser.add_argument("new_rev")
+    parser.add_argument("--cache", action="store_true", help="reuse records from .threatforge-cache")
+    args = parser.parse_args()
+
+    cache = ScanCache() if args.cache else None
+    try:
+        _, diff = incremental_scan(args.repo, args.framework, args.old_rev, args.new_rev, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    print_trigger_diff(diff)
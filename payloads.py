@@ -0,0 +1,189 @@
+import ast
+import copy
+import uuid
+import inspect
+import functools
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Sequence, Tuple
+
+# (positional args, keyword args) for one handler method call
+Inputs = Tuple[List[Any], Dict[str, Any]]
+
+PROBE_TEXT = "ThreatForge probe"
+
+# canonical positional parameters of each callback event, in call order
+EVENT_POSITIONAL = {
+    "on_llm_start": ("serialized", "prompts"),
+    "on_chat_model_start": ("serialized", "messages"),
+    "on_llm_new_token": ("token",),
+    "on_llm_end": ("response",),
+    "on_llm_error": ("error",),
+    "on_chain_start": ("serialized", "inputs"),
+    "on_chain_end": ("outputs",),
+    "on_chain_error": ("error",),
+    "on_tool_start": ("serialized", "input_str"),
+    "on_tool_end": ("output",),
+    "on_tool_error": ("error",),
+    "on_agent_action": ("action",),
+    "on_agent_finish": ("finish",),
+    "on_retriever_start": ("serialized", "query"),
+    "on_retriever_end": ("documents",),
+    "on_retriever_error": ("error",),
+    "on_text": ("text",),
+    # LlamaIndex BaseCallbackHandler
+    "on_event_start": ("event_type", "payload", "event_id", "parent_id"),
+    "on_event_end": ("event_type", "payload", "event_id"),
+}
+
+# keyword arguments every LangChain callback receives
+COMMON_KEYWORDS = ("run_id", "parent_run_id", "tags", "metadata")
+
+def _langchain_message():
+    try:
+        from langchain_core.messages import HumanMessage
+        return HumanMessage(content=f"{PROBE_TEXT} message")
+    except ImportError:
+        return SimpleNamespace(type="human", content=f"{PROBE_TEXT} message")
+
+def _llm_result():
+    usage = {"token_usage": {"prompt_tokens": 4, "completion_tokens": 4, "total_tokens": 8}}
+    try:
+        from langchain_core.outputs import Generation, LLMResult
+        return LLMResult(generations=[[Generation(text=f"{PROBE_TEXT} response")]], llm_output=usage)
+    except ImportError:
+        return SimpleNamespace(generations=[[SimpleNamespace(text=f"{PROBE_TEXT} response")]], llm_output=usage)
+
+def _agent_action():
+    try:
+        from langchain_core.agents import AgentAction
+        return AgentAction(tool="probe_tool", tool_input=PROBE_TEXT, log=f"{PROBE_TEXT} action")
+    except ImportError:
+        return SimpleNamespace(tool="probe_tool", tool_input=PROBE_TEXT, log=f"{PROBE_TEXT} action")
+
+def _agent_finish():
+    try:
+        from langchain_core.agents import AgentFinish
+        return AgentFinish(return_values={"output": PROBE_TEXT}, log=f"{PROBE_TEXT} finish")
+    except ImportError:
+        return SimpleNamespace(return_values={"output": PROBE_TEXT}, log=f"{PROBE_TEXT} finish")
+
+def _documents():
+    try:
+        from langchain_core.documents import Document
+        return [Document(page_content=f"{PROBE_TEXT} document", metadata={"source": "probe"})]
+    except ImportError:
+        return [SimpleNamespace(page_content=f"{PROBE_TEXT} document", metadata={"source": "probe"})]
+
+def _event_type():
+    try:
+        from llama_index.core.callbacks import CBEventType
+        return CBEventType.LLM
+    except ImportError:
+        return "llm"
+
+# typed fixture per parameter name
+FIXTURES: Dict[str, Callable[[], Any]] = {
+    "serialized": lambda: {"name": "ThreatForgeProbe", "id": ["threatforge", "probe"], "kwargs": {}},
+    "prompts": lambda: [f"{PROBE_TEXT} prompt"],
+    "messages": lambda: [[_langchain_message()]],
+    "token": lambda: "probe",
+    "response": _llm_result,
+    "error": lambda: RuntimeError(f"{PROBE_TEXT} error"),
+    "inputs": lambda: {"input": f"{PROBE_TEXT} input"},
+    "outputs": lambda: {"output": f"{PROBE_TEXT} output"},
+    "input_str": lambda: f"{PROBE_TEXT} tool input",
+    "output": lambda: f"{PROBE_TEXT} tool output",
+    "action": _agent_action,
+    "finish": _agent_finish,
+    "query": lambda: f"{PROBE_TEXT} query",
+    "documents": _documents,
+    "text": lambda: f"{PROBE_TEXT} text",
+    "run_id": lambda: uuid.UUID(int=1),
+    "parent_run_id": lambda: uuid.UUID(int=0),
+    "tags": lambda: ["threatforge"],
+    "metadata": lambda: {"probe": True},
+    "event_type": _event_type,
+    "payload": lambda: {"messages": [f"{PROBE_TEXT} message"], "response": f"{PROBE_TEXT} response"},
+    "event_id": lambda: "threatforge-event",
+    "parent_id": lambda: "threatforge-parent",
+    "node_id": lambda: "threatforge-node",
+    "span": lambda: "threatforge-span",
+    "traced": lambda: True,
+}
+
+# the cached values are templates only: handlers may mutate what they are
+# given, so callers always get a deep copy
+
+@functools.lru_cache(maxsize=None)
+def _fixture(name: str) -> Any:
+    factory = FIXTURES.get(name)
+    return factory() if factory is not None else f"{PROBE_TEXT} {name}"
+
+@functools.lru_cache(maxsize=None)
+def _build_inputs(method: str, arg_names: FrozenSet[str]) -> Inputs:
+    positional = EVENT_POSITIONAL.get(method, ())
+    args = [_fixture(name) for name in positional]
+    names = [n for n in sorted(arg_names) if n not in positional]
+    keywords = {name: _fixture(name) for name in (*COMMON_KEYWORDS, *names)}
+    return args, keywords
+
+def fixture(name: str) -> Any:
+    """A fresh copy of the test value for a parameter name; unknown names get a probe string."""
+    return copy.deepcopy(_fixture(name))
+
+def build_inputs(method: str, arg_names: FrozenSet[str]) -> Inputs:
+    """
+    Inputs for a handler method with the given parameter names. The event's
+    canonical positional arguments come first, so renamed positionals still
+    get the right type; every other named parameter and the common run
+    keywords are passed by name. Construction is cached per method and name
+    set, but every call returns its own copy, so a handler that mutates its
+    inputs cannot affect the next one.
+    """
+    return copy.deepcopy(_build_inputs(method, arg_names))
+
+def _live_arg_names(fn: Callable) -> FrozenSet[str]:
+    try:
+        params = inspect.signature(fn).parameters.values()
+    except (TypeError, ValueError):
+        return frozenset()
+    return frozenset(p.name for p in params if p.kind not in (p.VAR_POSITIONAL, p.VAR_KEYWORD))
+
+def inputs_for(handler: Any, methods: Iterable[str]) -> Dict[str, Inputs]:
+    """Inputs for each of methods that handler defines, from its live signatures."""
+    inputs = {}
+    for name in methods:
+        method = getattr(handler, name, None)
+        if method is not None:
+            inputs[name] = build_inputs(name, _live_arg_names(method))
+    return inputs
+
+def _is_staticmethod(fn: ast.AST) -> bool:
+    return any(isinstance(d, ast.Name) and d.id == "staticmethod" for d in fn.decorator_list)
+
+def static_inputs(tree: ast.AST, class_name: str, methods: Sequence[str] = None) -> Dict[str, Inputs]:
+    """
+    Inputs for the on_* methods (or `methods`) of class_name in a parsed
+    module, from event-trigger's _get_arg_names, without importing the module.
+    """
+    from scanner import load_event_trigger
+    get_arg_names = load_event_trigger()._get_arg_names
+    inputs = {}
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.ClassDef) and node.name == class_name):
+            continue
+        for fn in node.body:
+            if not isinstance(fn, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            if (fn.name in methods) if methods is not None else fn.name.startswith("on_"):
+                # match _live_arg_names on the bound method: no self, *args or **kwargs
+                skip = {a.arg for a in (fn.args.vararg, fn.args.kwarg) if a is not None}
+                positional = fn.args.posonlyargs + fn.args.args
+                if positional and not _is_staticmethod(fn):
+                    skip.add(positional[0].arg)
+                inputs[fn.name] = build_inputs(fn.name, frozenset(get_arg_names(fn)) - skip)
+    return inputs
+
+def clear_fixtures():
+    _fixture.cache_clear()
+    _build_inputs.cache_clear()
@@ -0,0 +1,181 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+MODES = ("replay", "record", "auto")
+
+def prompt_key(messages: List[BaseMessage], stop: Optional[List[str]] = None) -> str:
+    """Stable cassette key of a chat request: message types and contents plus stop words."""
+    payload = json.dumps([[[m.type, m.content] for m in messages], stop or []], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _dump_result(result: ChatResult) -> Dict:
+    return {
+        "generations": [
+            {
+                "text": g.message.content,
+                "response_metadata": g.message.response_metadata,
+                "usage_metadata": g.message.usage_metadata,
+                "generation_info": g.generation_info,
+            }
+            for g in result.generations
+        ],
+        "llm_output": result.llm_output,
+    }
+
+def _load_result(entry: Dict) -> ChatResult:
+    generations = [
+        ChatGeneration(
+            message=AIMessage(content=g["text"], response_metadata=g.get("response_metadata") or {},
+                              usage_metadata=g.get("usage_metadata")),
+            generation_info=g.get("generation_info"),
+        )
+        for g in entry["generations"]
+    ]
+    return ChatResult(generations=generations, llm_output=entry.get("llm_output"))
+
+def token_usage(prompt_tokens: int, completion_tokens: int) -> Dict[str, int]:
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+class Cassette:
+    """
+    Recorded chat results per prompt_key, saved as JSON. A prompt recorded
+    several times replays its results in order and then repeats the last one.
+    """
+    def __init__(self, path: str = None):
+        self.path = path
+        self.interactions: Dict[str, List[Dict]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.interactions = json.load(f)["interactions"]
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.interactions.values())
+
+    def next(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entries = self.interactions.get(key)
+            if not entries:
+                return None
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+            return entries[min(i, len(entries) - 1)]
+
+    def add(self, key: str, entry: Dict):
+        with self._lock:
+            self.interactions.setdefault(key, []).append(entry)
+
+    def add_text(self, messages: List[BaseMessage], text: str, prompt_tokens: int = None,
+                 completion_tokens: int = None, model_name: str = "threatforge-replay"):
+        """Record a synthetic answer, e.g. for benchmark workloads without a real model."""
+        if prompt_tokens is None:
+            prompt_tokens = sum(len(str(m.content).split()) for m in messages)
+        if completion_tokens is None:
+            completion_tokens = len(text.split())
+        usage = token_usage(prompt_tokens, completion_tokens)
+        self.add(prompt_key(messages), {
+            "generations": [{"text": text, "response_metadata": {"model_name": model_name},
+                             "usage_metadata": {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                                                "total_tokens": usage["total_tokens"]},
+                             "generation_info": None}],
+            "llm_output": {"token_usage": usage, "model_name": model_name},
+        })
+
+    def save(self, path: str = None):
+        path = path or self.path
+        tmp = f"{path}.tmp"
+        with self._lock, open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"interactions": self.interactions}, f, indent=1, default=str)
+        os.replace(tmp, path)
+
+    def rewind(self):
+        with self._lock:
+            self._cursor.clear()
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Chat model backed by a Cassette. Going through BaseChatModel gives
+    callbacks the same on_chat_model_start (or on_llm_start fallback) and
+    on_llm_end sequence a real model produces, with the recorded
+    generations and token usage, but no network, key or latency.
+
+    mode "replay" fails on unrecorded prompts; "record" always calls `inner`
+    (the real model) and saves its answers; "auto" replays when it can and
+    records otherwise.
+
+        llm = ReplayChatModel(cassette_path="tests.cassette.json", callbacks=[handler])
+        llm.invoke("Give me 30 words")
+    """
+    cassette_path: Optional[str] = None
+    mode: str = "replay"
+    inner: Optional[BaseChatModel] = None
+
+    _cassette: Cassette = PrivateAttr()
+
+    def __init__(self, cassette: Cassette = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown mode: {self.mode}")
+        self._cassette = cassette if cassette is not None else Cassette(self.cassette_path)
+
+    @property
+    def cassette(self) -> Cassette:
+        return self._cassette
+
+    @property
+    def _llm_type(self) -> str:
+        return "threatforge-replay"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"cassette_path": self.cassette_path, "mode": self.mode}
+
+    def _record(self, key: str, messages: List[BaseMessage], stop: Optional[List[str]], **kwargs: Any) -> ChatResult:
+        if self.inner is None:
+            raise ValueError("record mode needs the real model as `inner`")
+        result = self.inner._generate(messages, stop=stop, **kwargs)
+        self._cassette.add(key, _dump_result(result))
+        if self._cassette.path is not None:
+            self._cassette.save()
+        return result
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        key = prompt_key(messages, stop)
+        if self.mode != "record":
+            entry = self._cassette.next(key)
+            if entry is not None:
+                return _load_result(entry)
+            if self.mode == "replay":
+                raise KeyError(f"No recorded interaction for prompt {key[:12]} in {self.cassette_path}")
+        return self._record(key, messages, stop, **kwargs)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        # replay is a dict lookup: no executor hop
+        return self._generate(messages, stop, **kwargs)
+
+    def _combine_llm_outputs(self, llm_outputs: List[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        # sum token usage across a batch, as the hosted chat models do
+        usage: Dict[str, int] = {}
+        combined: Dict[str, Any] = {}
+        for output in llm_outputs:
+            if not output:
+                continue
+            for k, v in output.get("token_usage", {}).items():
+                usage[k] = usage.get(k, 0) + v
+            combined.update({k: v for k, v in output.items() if k != "token_usage"})
+        if usage:
+            combined["token_usage"] = usage
+        return combined
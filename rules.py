@@ -0,0 +1,126 @@
+import os
+import re
+import json
+import hashlib
+import functools
+from typing import Any, Dict, FrozenSet, List, Set, Tuple
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+
+# set to a rules JSON path to score with it instead of rules.json
+RULES_ENV = "THREATFORGE_RULES"
+
+# TRIGGER_PREFILTER in event-trigger.py relies on this prefix, so it is not configurable
+EVENT_PREFIX = "on_"
+
+class FrameworkRules:
+    """
+    Scoring rules of one framework. Name tokens are compiled into a single
+    lookahead alternation, longest token first, so one regex pass over a
+    function name finds every token occurring in it, overlaps included:
+    any other token starting at a match position is a prefix of the match.
+    """
+    def __init__(self, tokens: Dict[str, int], weights: Dict[str, int], threshold: int,
+                 param_hints: Dict[str, Tuple[FrozenSet[str], int]]):
+        self.tokens = tokens
+        self.weights = weights
+        self.threshold = threshold
+        self.param_hints = param_hints
+        self._order = {tok: i for i, tok in enumerate(tokens)}
+        self._prefixes = {tok: [t for t in tokens if tok.startswith(t)] for tok in tokens}
+        self._matcher = None
+        if tokens:
+            alternation = "|".join(re.escape(t) for t in sorted(tokens, key=len, reverse=True))
+            self._matcher = re.compile(f"(?=({alternation}))")
+
+    def name_tokens(self, fn_name: str) -> List[str]:
+        """Tokens contained in fn_name, in rule order."""
+        if self._matcher is None:
+            return []
+        found: Set[str] = set()
+        for m in self._matcher.finditer(fn_name):
+            found.update(self._prefixes[m.group(1)])
+        return sorted(found, key=self._order.__getitem__)
+
+    def score(self, fn_name: str, argnames: Set[str], in_callback_class: bool) -> Tuple[int, List[str]]:
+        tags = []
+        if not fn_name.startswith(EVENT_PREFIX):
+            return -1, tags
+
+        score = self.weights["on_prefix"]
+        tags.append("on_prefix")
+
+        if in_callback_class:
+            score += self.weights["callback_class"]
+            tags.append("callback_class")
+
+        for tok in self.name_tokens(fn_name):
+            score += self.tokens[tok]
+            tags.append(f"name:{tok}")
+
+        for tag, (names, weight) in self.param_hints.items():
+            if not names.isdisjoint(argnames):
+                score += weight
+                tags.append(tag)
+
+        return score, tags
+
+def _framework_rules(defaults: Dict[str, Any], spec: Dict[str, Any]) -> FrameworkRules:
+    # framework entries override the defaults key by key; a null param hint drops it
+    weights = {**defaults.get("weights", {}), **spec.get("weights", {})}
+    for key in ("on_prefix", "callback_class", "name"):
+        if key not in weights:
+            raise ValueError(f"Missing weight: {key}")
+    tokens = spec.get("tokens", defaults.get("tokens", []))
+    if not isinstance(tokens, dict):
+        tokens = {tok: weights["name"] for tok in tokens}
+    if not all(tokens):
+        raise ValueError("Empty name token")
+    threshold = spec.get("threshold", defaults.get("threshold", 1))
+    if threshold < 0:
+        raise ValueError(f"Negative threshold: {threshold}")
+    hints = {**defaults.get("param_hints", {}), **spec.get("param_hints", {})}
+    param_hints = {tag: (frozenset(h["names"]), h.get("weight", 1)) for tag, h in hints.items() if h is not None}
+    return FrameworkRules(tokens, weights, threshold, param_hints)
+
+class RuleEngine:
+    """
+    Trigger scoring rules per framework, loaded from a JSON config:
+
+        {"defaults": {"weights": {...}, "threshold": 1, "param_hints": {tag: {"names": [...], "weight": 1}}},
+         "frameworks": {"LangChain": {"tokens": ["llm", ...]}, ...}}
+
+    tokens is a list scored with weights["name"] each, or a {token: weight}
+    map. A framework without an entry gets the defaults and no tokens. The
+    repr carries a digest of the config, so scan cache keys change with it.
+    """
+    def __init__(self, config: Dict[str, Any]):
+        canonical = json.dumps(config, sort_keys=True).encode("utf-8")
+        self.digest = hashlib.sha256(canonical).hexdigest()[:12]
+        defaults = config.get("defaults", {})
+        self.default = _framework_rules(defaults, {})
+        self.frameworks = {name: _framework_rules(defaults, spec)
+                           for name, spec in config.get("frameworks", {}).items()}
+
+    def __repr__(self) -> str:
+        return f"RuleEngine({self.digest})"
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleEngine":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def for_framework(self, framework: str) -> FrameworkRules:
+        return self.frameworks.get(framework, self.default)
+
+    def score(self, framework: str, fn_name: str, argnames: Set[str], in_callback_class: bool) -> Tuple[int, List[str]]:
+        return self.for_framework(framework).score(fn_name, argnames, in_callback_class)
+
+@functools.lru_cache(maxsize=None)
+def _load(path: str) -> RuleEngine:
+    return RuleEngine.from_file(path)
+
+def load_rules(path: str = None) -> RuleEngine:
+    """The rules at path, else at $THREATFORGE_RULES, else rules.json; loaded once per process."""
+    path = path or os.environ.get(RULES_ENV) or RULES_FILE
+    return _load(os.path.abspath(path))
@@ -0,0 +1,206 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import inspect
+import argparse
+import tempfile
+import importlib
+import contextlib
+import multiprocessing
+from multiprocessing.connection import wait
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from audit_harness import HANDLER_METHODS_DEFAULT, run_handler
+from egress import EgressRecorder
+
+TIMEOUT_DEFAULT = 30.0
+# address space per worker; framework imports alone can take over 1 GB, 0 disables the limit
+MEMORY_MB_DEFAULT = 4096
+# characters of a handler's captured stdout kept in its result
+STDOUT_MAX = 4096
+REPORT_DEFAULT = "validation_report.json"
+
+# stand-in for required constructor arguments such as server_url or api_key
+PLACEHOLDER_ARG = "http://threatforge.invalid/receive"
+
+def candidates_from_triggers(triggers: Iterable[Dict], min_score: int = 1,
+                             sinks_only: bool = False) -> List[Tuple[str, str]]:
+    """Distinct (file, class) handler classes among trigger records, in trigger order."""
+    seen = {}
+    for r in triggers:
+        if r["class"] is None or r["score"] < min_score:
+            continue
+        if sinks_only and not r.get("sinks"):
+            continue
+        seen.setdefault((r["file"], r["class"]), None)
+    return list(seen)
+
+def _package_root(path: str) -> Tuple[str, str]:
+    """(import root, dotted module name) of path, climbing through directories that hold an __init__.py."""
+    directory, file = os.path.split(os.path.abspath(path))
+    parts = [] if file == "__init__.py" else [os.path.splitext(file)[0]]
+    while os.path.isfile(os.path.join(directory, "__init__.py")):
+        directory, package = os.path.split(directory)
+        parts.insert(0, package)
+    return directory, ".".join(parts)
+
+def _load_class(path: str, class_name: str):
+    # import the candidate as part of its package, so relative imports resolve and
+    # its sibling modules do not shadow stdlib or top-level packages
+    root, name = _package_root(path)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    module = importlib.import_module(name)
+    return getattr(module, class_name)
+
+def instantiate_handler(cls) -> Any:
+    try:
+        params = list(inspect.signature(cls).parameters.values())
+    except (TypeError, ValueError):
+        return cls()
+    args = [PLACEHOLDER_ARG for p in params
+            if p.default is p.empty and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+    kwargs = {p.name: PLACEHOLDER_ARG for p in params if p.default is p.empty and p.kind == p.KEYWORD_ONLY}
+    return cls(*args, **kwargs)
+
+def _limit_memory(memory_mb: int):
+    if memory_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        # not enforceable on this platform
+        pass
+
+def _worker(conn, path: str, class_name: str, methods: Sequence[str], scratch: str, memory_mb: int):
+    # child process: constrain, move into the scratch dir, then load and drive the handler
+    # with all network egress intercepted and its prints captured
+    _limit_memory(memory_mb)
+    os.chdir(scratch)
+    stdout = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(stdout), EgressRecorder() as egress:
+            handler = instantiate_handler(_load_class(path, class_name))
+            result = run_handler(handler, methods)
+        result["egress"] = egress.records
+        outcome = {"status": "ok", "result": result}
+    except BaseException as e:
+        outcome = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+    try:
+        outcome["stdout"] = stdout.getvalue()[:STDOUT_MAX]
+        conn.send(outcome)
+    finally:
+        conn.close()
+
+def validate_candidates(candidates: Sequence[Tuple[str, str]],
+                        jobs: int = None,
+                        timeout: float = TIMEOUT_DEFAULT,
+                        memory_mb: int = MEMORY_MB_DEFAULT,
+                        methods: Sequence[str] = HANDLER_METHODS_DEFAULT) -> List[Dict]:
+    """
+    Run every (file, class) candidate in its own process, up to `jobs` at
+    a time, each with a wall-clock timeout, an address-space limit and a
+    fresh scratch working directory that is removed afterwards.
+
+    Returns one {"file", "class", "status", "seconds", ...} per candidate in
+    input order; status is ok, error, timeout or crashed, and "result" holds
+    the audit_harness.run_handler report of candidates that ran, with the
+    EgressRecorder records of their intercepted network traffic. "stdout"
+    holds the start of whatever the candidate printed.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    ctx = multiprocessing.get_context("spawn")
+    pending = list(enumerate(candidates))
+    pending.reverse()
+    running: Dict[Any, Tuple[int, Any, str, float]] = {}
+    results: List[Dict] = [{} for _ in candidates]
+
+    def finish(conn, outcome: Dict):
+        i, proc, scratch, start = running.pop(conn)
+        conn.close()
+        proc.join()
+        shutil.rmtree(scratch, ignore_errors=True)
+        path, class_name = candidates[i]
+        results[i] = {"file": path, "class": class_name, "seconds": time.monotonic() - start, **outcome}
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            i, (path, class_name) = pending.pop()
+            scratch = tempfile.mkdtemp(prefix="threatforge-run-")
+            parent, child = ctx.Pipe(duplex=False)
+            # the worker runs in the scratch dir, so a relative path must be resolved here
+            proc = ctx.Process(target=_worker,
+                               args=(child, os.path.abspath(path), class_name, methods, scratch, memory_mb),
+                               daemon=True)
+            proc.start()
+            # only the child holds the write end now, so its exit reads as EOF
+            child.close()
+            running[parent] = (i, proc, scratch, time.monotonic())
+
+        deadline = min(entry[3] for entry in running.values()) + timeout
+        for conn in wait(list(running), timeout=max(0.0, deadline - time.monotonic())):
+            try:
+                outcome = conn.recv()
+            except (EOFError, OSError):
+                proc = running[conn][1]
+                proc.join()
+                outcome = {"status": "crashed", "error": f"exit code {proc.exitcode}"}
+            finish(conn, outcome)
+
+        now = time.monotonic()
+        for conn, (_, proc, _, start) in list(running.items()):
+            if now - start >= timeout:
+                proc.kill()
+                finish(conn, {"status": "timeout", "error": f"exceeded {timeout:g}s"})
+    return results
+
+def summarize(results: List[Dict]) -> Dict:
+    status = {}
+    flagged = 0
+    egress = 0
+    for r in results:
+        status[r["status"]] = status.get(r["status"], 0) + 1
+        result = r.get("result", {})
+        if result.get("events") or result.get("egress"):
+            flagged += 1
+        if result.get("egress"):
+            egress += 1
+    return {"candidates": len(results), "status": status, "with_side_effects": flagged, "with_egress": egress}
+
+def save_report(results: List[Dict], outfile: str = REPORT_DEFAULT):
+    with open(outfile, "w", encoding="utf-8") as f:
+        json.dump({"summary": summarize(results), "results": results}, f, indent=2)
+    print(f"[INFO] Saved validation report to {outfile}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate trigger candidates in sandboxed worker processes")
+    parser.add_argument("repo")
+    parser.add_argument("framework")
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_DEFAULT)
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_MB_DEFAULT, help="0 disables the limit")
+    parser.add_argument("--min-score", type=int, default=3)
+    parser.add_argument("--sinks-only", action="store_true", help="only classes whose handlers reach a static sink")
+    parser.add_argument("--report", default=REPORT_DEFAULT)
+    args = parser.parse_args()
+
+    from scanner import load_event_trigger
+    scan = load_event_trigger().get_trigger_scan(args.repo, args.framework, hierarchy=True)
+    candidates = candidates_from_triggers(scan.triggers, args.min_score, args.sinks_only)
+    print(f"[INFO] Validating {len(candidates)} candidate classes")
+    results = validate_candidates(candidates, jobs=args.jobs, timeout=args.timeout, memory_mb=args.memory_mb)
+    summary = summarize(results)
+    for status, n in sorted(summary["status"].items()):
+        print(f"[INFO] {status}: {n}")
+    print(f"[INFO] with side effects: {summary['with_side_effects']}")
+    print(f"[INFO] with network egress: {summary['with_egress']}")
+    save_report(results, args.report)
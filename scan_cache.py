@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+CACHE_DIR_DEFAULT = ".threatforge-cache"
+MAX_BYTES_DEFAULT = 256 * 1024 * 1024
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+class ScanCache:
+    """
+    On-disk map from (file content hash, extractor key) to the records that
+    extractor produced for that content. The extractor key carries the
+    extractor's EXTRACTOR_VERSION and options, so bumping a version or
+    changing a mode never serves stale records.
+
+    Entries are evicted least-recently-used first once the stored payload
+    grows past max_bytes.
+    """
+    def __init__(self, cache_dir: str = CACHE_DIR_DEFAULT, max_bytes: int = MAX_BYTES_DEFAULT):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "scan.sqlite")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._touched: List[Tuple[float, str, str]] = []
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " digest TEXT NOT NULL,"
+            " extractor TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (digest, extractor))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS records_lru ON records (last_used)")
+
+    def get(self, digest: str, extractor: str) -> Optional[List[Dict]]:
+        row = self.conn.execute(
+            "SELECT payload FROM records WHERE digest = ? AND extractor = ?", (digest, extractor)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # last_used is written back in bulk on flush instead of per hit
+        self._touched.append((time.time(), digest, extractor))
+        return json.loads(row[0])
+
+    def put(self, digest: str, extractor: str, records: List[Dict]):
+        payload = json.dumps(records, separators=(",", ":"))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO records (digest, extractor, payload, size, last_used) VALUES (?, ?, ?, ?, ?)",
+            (digest, extractor, payload, len(payload), time.time()),
+        )
+
+    def evict(self) -> int:
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM records").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        # trim to 90% so a full cache does not evict on every flush
+        target = int(self.max_bytes * 0.9)
+        doomed = []
+        for digest, extractor, size in self.conn.execute(
+                "SELECT digest, extractor, size FROM records ORDER BY last_used"):
+            if total <= target:
+                break
+            doomed.append((digest, extractor))
+            total -= size
+        self.conn.executemany("DELETE FROM records WHERE digest = ? AND extractor = ?", doomed)
+        self.evicted += len(doomed)
+        return len(doomed)
+
+    def flush(self):
+        if self._touched:
+            self.conn.executemany(
+                "UPDATE records SET last_used = ? WHERE digest = ? AND extractor = ?", self._touched
+            )
+            self._touched = []
+        self.evict()
+        self.conn.commit()
+
+    def clear(self):
+        self.conn.execute("DELETE FROM records")
+        self.conn.commit()
+
+    def stats(self) -> Dict:
+        entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM records").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "evicted": self.evicted,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
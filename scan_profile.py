@@ -0,0 +1,122 @@
+import os
+import json
+import heapq
+import contextlib
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional
+
+SLOWEST_DEFAULT = 20
+
+# set to a JSON path to profile the __main__ reports
+PROFILE_ENV = "THREATFORGE_PROFILE"
+
+_active: Optional["ScanProfiler"] = None
+
+def active_profiler() -> Optional["ScanProfiler"]:
+    """The profiler scans report to, or None when profiling is off."""
+    return _active
+
+class ScanProfiler:
+    """
+    Opt-in instrumentation for the scan engine. While activated, scans record
+    cumulative seconds per phase (walk, read, prefilter, cache, parse,
+    visit:<extractor>, and score within visit:triggers), seconds per file and every read or parse
+    failure. Workers of a process pool profile locally and the parent merges
+    their snapshots. When no profiler is active the engine does one global
+    lookup per file and no timing.
+
+        with ScanProfiler() as prof:
+            find_event_triggers_in_repo(path, "LangChain")
+        prof.print_report()
+    """
+    def __init__(self, slowest: int = SLOWEST_DEFAULT):
+        self.slowest_n = slowest
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.calls: Counter = Counter()
+        self.file_seconds: Dict[str, float] = defaultdict(float)
+        self.failures: List[Dict[str, str]] = []
+        self.counts: Counter = Counter()
+        self._previous: Optional[ScanProfiler] = None
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] += seconds
+        self.calls[phase] += 1
+
+    def add_file(self, path: str, seconds: float):
+        self.file_seconds[path] += seconds
+
+    def failure(self, path: str, phase: str, error: BaseException):
+        self.failures.append({"file": path, "phase": phase, "error": str(error)})
+        self.counts[f"{phase}_failures"] += 1
+
+    def __enter__(self) -> "ScanProfiler":
+        global _active
+        self._previous, _active = _active, self
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active, self._previous = self._previous, None
+
+    def snapshot(self) -> Dict:
+        """Plain-dict state, small enough to return from a worker process."""
+        return {
+            "phases": dict(self.phases),
+            "calls": dict(self.calls),
+            "file_seconds": dict(self.file_seconds),
+            "failures": list(self.failures),
+            "counts": dict(self.counts),
+        }
+
+    def merge(self, snapshot: Dict):
+        for phase, seconds in snapshot["phases"].items():
+            self.phases[phase] += seconds
+        self.calls.update(snapshot["calls"])
+        for path, seconds in snapshot["file_seconds"].items():
+            self.file_seconds[path] += seconds
+        self.failures.extend(snapshot["failures"])
+        self.counts.update(snapshot["counts"])
+
+    def slowest(self, n: int = None) -> List[Dict]:
+        top = heapq.nlargest(n or self.slowest_n, self.file_seconds.items(), key=lambda kv: kv[1])
+        return [{"file": path, "seconds": seconds} for path, seconds in top]
+
+    def to_dict(self) -> Dict:
+        return {
+            "phases": {phase: {"seconds": s, "calls": self.calls[phase]} for phase, s in self.phases.items()},
+            "counts": dict(self.counts),
+            "files_timed": len(self.file_seconds),
+            "slowest": self.slowest(),
+            "failures": self.failures,
+        }
+
+    def to_json(self, path: str = None) -> str:
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def print_report(self, n: int = 10):
+        header = f"{'Phase':<24} | {'Seconds':<9} | {'Calls':<8}"
+        print(header)
+        print("-" * len(header))
+        for phase, seconds in sorted(self.phases.items(), key=lambda kv: -kv[1]):
+            print(f"{phase:<24} | {seconds:<9.3f} | {self.calls[phase]:<8}")
+        for key, value in sorted(self.counts.items()):
+            print(f"[INFO] {key}: {value}")
+        for r in self.slowest(n):
+            print(f"[SLOW] {r['seconds']:.3f}s {r['file']}")
+
+@contextlib.contextmanager
+def profile_from_env() -> Iterator[Optional[ScanProfiler]]:
+    """Profile the block when THREATFORGE_PROFILE is set; print the report and write the JSON on exit."""
+    target = os.environ.get(PROFILE_ENV)
+    if not target:
+        yield None
+        return
+    with ScanProfiler() as prof:
+        yield prof
+    prof.print_report()
+    prof.to_json(target)
+    print(f"[INFO] Scan profile written to {target}")
@@ -0,0 +1,707 @@
+import os
+import ast
+import sys
+import mmap
+import hashlib
+import tarfile
+import zipfile
+import posixpath
+import functools
+import importlib.util
+from time import perf_counter
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, as_completed, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+from scan_cache import ScanCache, content_hash
+from scan_profile import ScanProfiler, active_profiler
+
+EXCLUDE_DIRS_DEFAULT = {
+    "tests", "__pycache__", "venv", "examples", "docs", "site-packages",
+    "build", "dist", ".tox", ".mypy_cache", ".pytest_cache", ".venv", "notebooks", "scripts"
+}
+
+# An extractor turns one parsed module into a list of path-free records.
+Extractor = Callable[[ast.AST], List[Dict]]
+
+# files at least this large are prefiltered through mmap instead of a full read
+PREFILTER_MMAP_BYTES = 1 << 20
+
+# wheels, zips and sdists are scanned in place; a member's path is "<archive>!/<member>"
+ARCHIVE_SUFFIXES = (".whl", ".zip", ".tar.gz", ".tgz")
+ARCHIVE_SEP = "!/"
+
+# (index, count): scan only the files whose relative path hashes to index
+Shard = Tuple[int, int]
+
+# pool tasks submitted but not yet handed back, per worker: enough to keep every
+# worker busy while bounding the sources and records held in memory
+INFLIGHT_PER_WORKER = 2
+# ordered scans may also hold this many finished results per worker behind a
+# slow file, so the other workers keep going while it runs
+REORDER_PER_WORKER = 16
+
+def _is_test_file(file: str) -> bool:
+    return file.startswith("test_") or file.endswith("_test.py") or file == "conftest.py"
+
+def is_source_path(relpath: str, exclude_dirs: Iterable[str] = None) -> bool:
+    """
+    The iter_py_files filters applied to a '/'-separated path relative to the
+    scan root, for file lists that do not come from os.walk.
+    """
+    if exclude_dirs is None:
+        exclude_dirs = EXCLUDE_DIRS_DEFAULT
+    *dirs, file = relpath.split("/")
+    if any(d in exclude_dirs or d.startswith(".") for d in dirs):
+        return False
+    return file.endswith(".py") and not _is_test_file(file)
+
+def iter_py_files(repo_path: str, exclude_dirs: Iterable[str] = None) -> Iterator[str]:
+    """
+    Walk repo_path and yield every framework source file, skipping excluded
+    and hidden directories as well as test files.
+    """
+    if exclude_dirs is None:
+        exclude_dirs = EXCLUDE_DIRS_DEFAULT
+    exclude_dirs = set(exclude_dirs)
+
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d not in exclude_dirs and not d.startswith(".")]
+        for file in files:
+            if not file.endswith(".py"):
+                continue
+            if _is_test_file(file):
+                continue
+            yield os.path.join(root, file)
+
+def parse_shard(spec: str) -> Shard:
+    """Shard from an "i/n" spec, 0 <= i < n."""
+    index, _, count = spec.partition("/")
+    try:
+        shard = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Invalid shard spec: {spec!r}, expected i/n") from None
+    if not 0 <= shard[0] < shard[1]:
+        raise ValueError(f"Invalid shard spec: {spec!r}, expected 0 <= i < n")
+    return shard
+
+def shard_of(relpath: str, count: int) -> int:
+    """Shard index of a '/'-separated path relative to the scan root; the same on every host."""
+    digest = hashlib.blake2b(relpath.encode("utf-8", errors="surrogateescape"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+def _in_shard(relpath: str, shard: Optional[Shard]) -> bool:
+    return shard is None or shard_of(relpath, shard[1]) == shard[0]
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_SUFFIXES) and os.path.isfile(path)
+
+def _archive_members(archive_path: str) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+    # (member name, reader) in archive order; a tarball is read as one forward stream
+    if archive_path.lower().endswith((".whl", ".zip")):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir():
+                    yield info.filename, functools.partial(zf.read, info)
+        return
+    with tarfile.open(archive_path, "r|*") as tf:
+        for member in tf:
+            if member.isfile():
+                yield member.name, tf.extractfile(member).read
+
+def iter_archive_sources(archive_path: str, exclude_dirs: Iterable[str] = None,
+                         shard: Optional[Shard] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Stream (archive!/member, bytes) for every member of a wheel, zip or
+    tarball that is_source_path accepts, without extracting anything to disk.
+    With a shard, members of other shards are skipped unread.
+    """
+    prof = active_profiler()
+    try:
+        for name, read in _archive_members(archive_path):
+            name = posixpath.normpath(name)
+            if not is_source_path(name, exclude_dirs) or not _in_shard(name, shard):
+                continue
+            path = f"{archive_path}{ARCHIVE_SEP}{name}"
+            start = perf_counter() if prof else 0.0
+            data = read()
+            if prof:
+                seconds = perf_counter() - start
+                prof.add("read", seconds)
+                prof.add_file(path, seconds)
+            yield path, data
+    except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) as e:
+        print(f"[WARN] Failed reading {archive_path}: {e}")
+        if prof:
+            prof.failure(archive_path, "read", e)
+
+def _timed_walk(paths: Iterator[str], prof: ScanProfiler) -> Iterator[str]:
+    seconds = 0.0
+    try:
+        while True:
+            start = perf_counter()
+            path = next(paths, None)
+            seconds += perf_counter() - start
+            if path is None:
+                return
+            yield path
+    finally:
+        prof.add("walk", seconds)
+
+def _sharded(paths: Iterator[str], repo_path: str, shard: Shard) -> Iterator[str]:
+    for path in paths:
+        if _in_shard(os.path.relpath(path, repo_path).replace(os.sep, "/"), shard):
+            yield path
+
+def _walk(repo_path: str, exclude_dirs: Optional[Iterable[str]], prof: Optional[ScanProfiler],
+          shard: Optional[Shard] = None) -> Iterator[str]:
+    paths = iter_py_files(repo_path, exclude_dirs)
+    if shard is not None:
+        paths = _sharded(paths, repo_path, shard)
+    return paths if prof is None else _timed_walk(paths, prof)
+
+def read_source(path: str) -> Optional[bytes]:
+    prof = active_profiler()
+    start = perf_counter() if prof else 0.0
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except Exception as e:
+        print(f"[WARN] Failed parsing {path}: {e}")
+        if prof:
+            prof.failure(path, "read", e)
+        return None
+    if prof:
+        seconds = perf_counter() - start
+        prof.add("read", seconds)
+        prof.add_file(path, seconds)
+    return data
+
+def _read_prefiltered(path: str, prefilter: Optional[Pattern[bytes]]) -> Tuple[Optional[bytes], bool]:
+    """
+    (file bytes, skipped). Files the prefilter does not match are skipped
+    before they are decoded or parsed; large files are searched memory-mapped
+    and only read in full when they match.
+    """
+    if prefilter is None:
+        return read_source(path), False
+    prof = active_profiler()
+    start = perf_counter() if prof else 0.0
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size >= PREFILTER_MMAP_BYTES:
+                # the mapped search pages the file in, so it is all prefilter time
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    data = mm[:] if prefilter.search(mm) is not None else None
+                if prof:
+                    seconds = perf_counter() - start
+                    prof.add("prefilter", seconds)
+                    prof.add_file(path, seconds)
+                return data, data is None
+            data = f.read()
+    except Exception as e:
+        print(f"[WARN] Failed parsing {path}: {e}")
+        if prof:
+            prof.failure(path, "read", e)
+        return None, False
+    if prof:
+        read_end = perf_counter()
+        prof.add("read", read_end - start)
+    matched = prefilter.search(data) is not None
+    if prof:
+        end = perf_counter()
+        prof.add("prefilter", end - read_end)
+        prof.add_file(path, end - start)
+    return (data, False) if matched else (None, True)
+
+def parse_source(path: str, data: bytes) -> Optional[ast.AST]:
+    prof = active_profiler()
+    start = perf_counter() if prof else 0.0
+    try:
+        tree = ast.parse(data.decode("utf-8", errors="ignore"))
+    except Exception as e:
+        print(f"[WARN] Failed parsing {path}: {e}")
+        if prof:
+            prof.failure(path, "parse", e)
+        return None
+    if prof:
+        prof.add("parse", perf_counter() - start)
+    return tree
+
+def parse_file(path: str) -> Optional[ast.AST]:
+    data = read_source(path)
+    if data is None:
+        return None
+    return parse_source(path, data)
+
+def extractor_key(extract: Extractor) -> str:
+    """
+    Stable identity of an extractor for the scan cache: function name, the
+    EXTRACTOR_VERSION of its module and any bound options.
+    """
+    func, options = extract, {}
+    if isinstance(extract, functools.partial):
+        func, options = extract.func, extract.keywords
+    version = getattr(sys.modules.get(func.__module__), "EXTRACTOR_VERSION", 0)
+    bound = ",".join(f"{k}={v!r}" for k, v in sorted(options.items()))
+    return f"{func.__qualname__}@{version}({bound})"
+
+def load_event_trigger():
+    """
+    event-trigger.py cannot be imported by name; load it once as `event_trigger`
+    so its extractors can be pickled to and resolved in worker processes.
+    """
+    module = sys.modules.get("event_trigger")
+    if module is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "event-trigger.py")
+        spec = importlib.util.spec_from_file_location("event_trigger", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["event_trigger"] = module
+        spec.loader.exec_module(module)
+    return module
+
+def process_pool(jobs: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=jobs, initializer=load_event_trigger)
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def _extract(tree: ast.AST, extractors: Dict[str, Extractor]) -> Dict[str, List[Dict]]:
+    prof = active_profiler()
+    if prof is None:
+        return {name: extract(tree) for name, extract in extractors.items()}
+    found = {}
+    for name, extract in extractors.items():
+        start = perf_counter()
+        found[name] = extract(tree)
+        prof.add(f"visit:{name}", perf_counter() - start)
+    return found
+
+def _run_profiled(slowest: int, fn: Callable, *args):
+    # worker side of a profiled pool task: profile locally, ship the snapshot back
+    with ScanProfiler(slowest) as prof:
+        result = fn(*args)
+    return result, prof.snapshot()
+
+def _submit(executor: Executor, prof: Optional[ScanProfiler], fn: Callable, *args):
+    # thread pools share the parent's profiler; only worker processes need their own
+    if prof is None or not isinstance(executor, ProcessPoolExecutor):
+        return executor.submit(fn, *args)
+    return executor.submit(_run_profiled, prof.slowest_n, fn, *args)
+
+def _result(future, prof: Optional[ScanProfiler], executor: Executor):
+    if prof is None or not isinstance(executor, ProcessPoolExecutor):
+        return future.result()
+    result, snapshot = future.result()
+    prof.merge(snapshot)
+    return result
+
+def _workers(executor: Executor) -> int:
+    return getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+
+def _map_bounded(executor: Executor, prof: Optional[ScanProfiler], fn: Callable,
+                 tasks: Iterable[Tuple[Any, Optional[tuple]]],
+                 ordered: bool = True) -> Iterator[Tuple[Any, Any]]:
+    """
+    (key, fn(*args)) for each (key, args) task, with at most
+    INFLIGHT_PER_WORKER tasks per worker running. args=None is a task with
+    nothing to run and result None. ordered=False hands results back as they
+    finish; ordered=True in task order, buffering up to REORDER_PER_WORKER
+    results per worker behind an unfinished one.
+    """
+    window = INFLIGHT_PER_WORKER * _workers(executor)
+    if ordered:
+        limit = max(REORDER_PER_WORKER * _workers(executor), window)
+        queue = deque()
+        running = set()
+
+        def ready():
+            while queue and (queue[0][1] is None or queue[0][1].done()):
+                key, future = queue.popleft()
+                yield key, None if future is None else _result(future, prof, executor)
+
+        for key, args in tasks:
+            future = None if args is None else _submit(executor, prof, fn, *args)
+            queue.append((key, future))
+            if future is not None:
+                running.add(future)
+            yield from ready()
+            while len(queue) >= limit or len(running) >= window:
+                if len(queue) >= limit:
+                    # the buffer is full behind the head: only the head can free it
+                    wait([queue[0][1]])
+                else:
+                    wait(running, return_when=FIRST_COMPLETED)
+                running = {f for f in running if not f.done()}
+                yield from ready()
+        while queue:
+            key, future = queue.popleft()
+            yield key, None if future is None else _result(future, prof, executor)
+        return
+
+    running = {}
+    for key, args in tasks:
+        if args is None:
+            yield key, None
+            continue
+        running[_submit(executor, prof, fn, *args)] = key
+        if len(running) >= window:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield running.pop(future), _result(future, prof, executor)
+    for future in as_completed(list(running)):
+        yield running.pop(future), _result(future, prof, executor)
+
+def _scan_file(path: str, extractors: Dict[str, Extractor],
+               prefilter: Optional[Pattern[bytes]] = None) -> Tuple[Optional[Dict[str, List[Dict]]], bool]:
+    # runs in the worker: the tree never leaves the process, only the records do
+    data, skipped = _read_prefiltered(path, prefilter)
+    if data is None:
+        return None, skipped
+    return _scan_source(path, data, extractors), False
+
+def _scan_source(path: str, data: bytes, extractors: Dict[str, Extractor]) -> Optional[Dict[str, List[Dict]]]:
+    prof = active_profiler()
+    start = perf_counter() if prof else 0.0
+    tree = parse_source(path, data)
+    found = _extract(tree, extractors) if tree is not None else None
+    if prof:
+        prof.add_file(path, perf_counter() - start)
+    return found
+
+def _iter_scan_parallel(paths: List[str],
+                        extractors: Dict[str, Extractor],
+                        executor: Executor,
+                        ordered: bool,
+                        prefilter: Optional[Pattern[bytes]],
+                        stats: Counter) -> Iterator[Tuple[str, Dict[str, List[Dict]]]]:
+    # ordered results go back in walk order to match the serial path, with
+    # later files finishing behind a slow one; unordered consumers take them
+    # as workers finish, so the largest files go first and a huge module does
+    # not become the long tail
+    prof = active_profiler()
+    if not ordered:
+        paths = sorted(paths, key=lambda path: -_file_size(path))
+    stats["files"] += len(paths)
+    tasks = ((path, (path, extractors, prefilter)) for path in paths)
+    for path, (found, skipped) in _map_bounded(executor, prof, _scan_file, tasks, ordered):
+        stats["prefilter_skipped"] += skipped
+        if found is not None:
+            yield path, found
+
+def _read_sources(paths: Iterable[str],
+                  prefilter: Optional[Pattern[bytes]],
+                  stats: Counter) -> Iterator[Tuple[str, bytes]]:
+    for path in paths:
+        stats["files"] += 1
+        data, skipped = _read_prefiltered(path, prefilter)
+        stats["prefilter_skipped"] += skipped
+        if data is not None:
+            yield path, data
+
+def _filter_sources(sources: Iterable[Tuple[str, bytes]],
+                    prefilter: Optional[Pattern[bytes]],
+                    stats: Counter) -> Iterator[Tuple[str, bytes]]:
+    for path, data in sources:
+        stats["files"] += 1
+        if prefilter is not None and prefilter.search(data) is None:
+            stats["prefilter_skipped"] += 1
+            continue
+        yield path, data
+
+def _iter_scan_cached(sources: Iterable[Tuple[str, bytes]],
+                      extractors: Dict[str, Extractor],
+                      cache: ScanCache,
+                      executor: Optional[Executor],
+                      ordered: bool = True) -> Iterator[Tuple[str, Dict[str, List[Dict]]]]:
+    """
+    Hash every file and serve extractor records from the cache; only files
+    with at least one miss are decoded and parsed, and only for the missing
+    extractors. Misses go to the executor when one is given, a bounded
+    window of files at a time; results keep source order unless ordered=False.
+    """
+    keys = {name: extractor_key(extract) for name, extract in extractors.items()}
+    prof = active_profiler()
+
+    def complete(path, digest, found, fresh):
+        if fresh is not None:
+            start = perf_counter() if prof else 0.0
+            for name, records in fresh.items():
+                cache.put(digest, keys[name], records)
+            if prof:
+                prof.add("cache", perf_counter() - start)
+            found.update(fresh)
+        if len(found) == len(extractors):
+            return {name: found[name] for name in extractors}
+        return None
+
+    def lookups():
+        for path, data in sources:
+            start = perf_counter() if prof else 0.0
+            digest = content_hash(data)
+            found = {}
+            for name, key in keys.items():
+                records = cache.get(digest, key)
+                if records is not None:
+                    found[name] = records
+            if prof:
+                seconds = perf_counter() - start
+                prof.add("cache", seconds)
+                prof.add_file(path, seconds)
+            missing = {name: extract for name, extract in extractors.items() if name not in found}
+            yield (path, digest, found), (path, data, missing) if missing else None
+
+    if executor is None:
+        results = ((entry, _scan_source(*args) if args else None) for entry, args in lookups())
+    else:
+        results = _map_bounded(executor, prof, _scan_source, lookups(), ordered)
+    for (path, digest, found), fresh in results:
+        done = complete(path, digest, found, fresh)
+        if done is not None:
+            yield path, done
+
+def _count_stats(scan: Iterator, stats: Counter, prof: ScanProfiler) -> Iterator:
+    # credit the profiler with what this scan added to stats, even if abandoned early
+    before = Counter(stats)
+    try:
+        yield from scan
+    finally:
+        prof.counts.update(stats - before)
+
+def _iter_scan(repo_path: str,
+               extractors: Dict[str, Extractor],
+               exclude_dirs: Optional[Iterable[str]],
+               jobs: int,
+               executor: Optional[Executor],
+               cache: Optional[ScanCache],
+               ordered: bool,
+               prefilter: Optional[Pattern[bytes]],
+               stats: Counter,
+               prof: Optional[ScanProfiler],
+               shard: Optional[Shard]) -> Iterator[Tuple[str, Dict[str, List[Dict]]]]:
+    if is_archive(repo_path):
+        sources = _filter_sources(iter_archive_sources(repo_path, exclude_dirs, shard), prefilter, stats)
+        if executor is None and jobs > 1:
+            with process_pool(jobs) as pool:
+                yield from _iter_scan_sources(sources, extractors, cache, pool, ordered)
+        else:
+            yield from _iter_scan_sources(sources, extractors, cache, executor, ordered)
+        return
+
+    if cache is not None:
+        try:
+            if executor is not None or jobs <= 1:
+                sources = _read_sources(_walk(repo_path, exclude_dirs, prof, shard), prefilter, stats)
+                yield from _iter_scan_cached(sources, extractors, cache, executor, ordered)
+            else:
+                with process_pool(jobs) as pool:
+                    sources = _read_sources(_walk(repo_path, exclude_dirs, prof, shard), prefilter, stats)
+                    yield from _iter_scan_cached(sources, extractors, cache, pool, ordered)
+        finally:
+            cache.flush()
+        return
+
+    if executor is not None or jobs > 1:
+        paths = list(_walk(repo_path, exclude_dirs, prof, shard))
+        if executor is not None:
+            yield from _iter_scan_parallel(paths, extractors, executor, ordered, prefilter, stats)
+        else:
+            with process_pool(jobs) as pool:
+                yield from _iter_scan_parallel(paths, extractors, pool, ordered, prefilter, stats)
+        return
+
+    for path in _walk(repo_path, exclude_dirs, prof, shard):
+        stats["files"] += 1
+        found, skipped = _scan_file(path, extractors, prefilter)
+        stats["prefilter_skipped"] += skipped
+        if found is not None:
+            yield path, found
+
+def iter_scan(repo_path: str,
+              extractors: Dict[str, Extractor],
+              exclude_dirs: Iterable[str] = None,
+              *,
+              jobs: int = 1,
+              executor: Optional[Executor] = None,
+              cache: Optional[ScanCache] = None,
+              ordered: bool = True,
+              prefilter: Optional[Pattern[bytes]] = None,
+              stats: Optional[Counter] = None,
+              shard: Optional[Shard] = None) -> Iterator[Tuple[str, Dict[str, List[Dict]]]]:
+    """
+    Parse every source file once and run all extractors on the same tree.
+    Yields (path, {extractor name: records}) for each file that parsed.
+
+    With jobs > 1 (or a shared executor) parsing and extraction run in a
+    process pool; extractors must then be picklable, e.g. functools.partial
+    over a module-level function.
+
+    With a ScanCache, files whose content hash is already known for every
+    extractor skip decoding and parsing altogether.
+
+    ordered=False lets a process pool yield files in completion order, for
+    streaming consumers that do not need walk order.
+
+    prefilter is a bytes regex that every file able to produce a record must
+    match; other files are skipped unparsed. Only pass one when it holds for
+    all extractors. stats counts "files" and "prefilter_skipped".
+
+    repo_path may also be a .whl, .zip or .tar.gz file: its members are
+    filtered like a directory walk and streamed out of the archive, see
+    iter_archive_sources.
+
+    shard=(i, n) restricts the scan to the files whose relative path
+    shard_of puts in shard i, so n hosts can split one tree; see shards.py.
+
+    Phase and per-file timings go to the active ScanProfiler, if any.
+    """
+    if stats is None:
+        stats = Counter()
+    prof = active_profiler()
+    scan = _iter_scan(repo_path, extractors, exclude_dirs, jobs, executor, cache, ordered, prefilter, stats, prof,
+                      shard)
+    yield from (scan if prof is None else _count_stats(scan, stats, prof))
+
+def iter_scan_sources(sources: Iterable[Tuple[str, bytes]],
+                      extractors: Dict[str, Extractor],
+                      *,
+                      cache: Optional[ScanCache] = None,
+                      prefilter: Optional[Pattern[bytes]] = None,
+                      stats: Optional[Counter] = None) -> Iterator[Tuple[str, Dict[str, List[Dict]]]]:
+    """
+    iter_scan over in-memory (path, bytes) pairs, for sources that do not
+    live in a directory tree. Filtering is up to the caller.
+    """
+    if stats is None:
+        stats = Counter()
+    prof = active_profiler()
+    scan = _iter_scan_sources(_filter_sources(sources, prefilter, stats), extractors, cache)
+    yield from (scan if prof is None else _count_stats(scan, stats, prof))
+
+def _iter_scan_sources(sources: Iterable[Tuple[str, bytes]],
+                       extractors: Dict[str, Extractor],
+                       cache: Optional[ScanCache],
+                       executor: Optional[Executor] = None,
+                       ordered: bool = True) -> Iterator[Tuple[str, Dict[str, List[Dict]]]]:
+    if cache is not None:
+        try:
+            yield from _iter_scan_cached(sources, extractors, cache, executor, ordered)
+        finally:
+            cache.flush()
+        return
+
+    if executor is not None:
+        # the bytes travel to the worker; results come back in source order
+        # unless ordered=False
+        tasks = ((path, (path, data, extractors)) for path, data in sources)
+        for path, found in _map_bounded(executor, active_profiler(), _scan_source, tasks, ordered):
+            if found is not None:
+                yield path, found
+        return
+
+    for path, data in sources:
+        found = _scan_source(path, data, extractors)
+        if found is not None:
+            yield path, found
+
+def iter_sources(root: str, exclude_dirs: Iterable[str] = None) -> Iterator[Tuple[str, bytes]]:
+    """(path, bytes) of every source file in a directory tree or archive."""
+    if is_archive(root):
+        yield from iter_archive_sources(root, exclude_dirs)
+        return
+    for path in _walk(root, exclude_dirs, active_profiler()):
+        data = read_source(path)
+        if data is not None:
+            yield path, data
+
+def _unique_sources(roots: Dict[str, str],
+                    exclude_dirs: Optional[Iterable[str]],
+                    prefilter: Optional[Pattern[bytes]],
+                    placements: List[Tuple[str, str, str]],
+                    first_paths: Dict[str, str],
+                    stats: Counter) -> Iterator[Tuple[str, bytes]]:
+    # every file lands in placements; only the first file of each content is passed on
+    seen = set()
+    skipped = set()
+    for label, root in roots.items():
+        for path, data in iter_sources(root, exclude_dirs):
+            digest = content_hash(data)
+            placements.append((label, path, digest))
+            stats["files"] += 1
+            if digest in seen:
+                stats["prefilter_skipped"] += digest in skipped
+                continue
+            seen.add(digest)
+            stats["unique"] += 1
+            if prefilter is not None and prefilter.search(data) is None:
+                skipped.add(digest)
+                stats["prefilter_skipped"] += 1
+                continue
+            first_paths[path] = digest
+            yield path, data
+
+def iter_scan_versions(roots: Dict[str, str],
+                       extractors: Dict[str, Extractor],
+                       exclude_dirs: Iterable[str] = None,
+                       *,
+                       jobs: int = 1,
+                       executor: Optional[Executor] = None,
+                       cache: Optional[ScanCache] = None,
+                       prefilter: Optional[Pattern[bytes]] = None,
+                       stats: Optional[Counter] = None) -> Iterator[Tuple[str, str, Dict[str, List[Dict]]]]:
+    """
+    iter_scan over several trees or archives that share most of their files,
+    such as releases of one framework or packages vendoring each other, keyed
+    by label. Every file is read and hashed, but each distinct content is
+    prefiltered, parsed and extracted once; its records are then fanned out
+    to every path holding it. Yields (label, path, {extractor name: records})
+    in walk order per root, roots in order, once all roots are scanned.
+
+    Records are shared between the paths of one content and must not be
+    mutated. stats counts "files", "prefilter_skipped" per path and
+    "unique" contents.
+    """
+    if stats is None:
+        stats = Counter()
+    prof = active_profiler()
+    scan = _iter_scan_versions(roots, extractors, exclude_dirs, jobs, executor, cache, prefilter, stats)
+    yield from (scan if prof is None else _count_stats(scan, stats, prof))
+
+def _iter_scan_versions(roots: Dict[str, str],
+                        extractors: Dict[str, Extractor],
+                        exclude_dirs: Optional[Iterable[str]],
+                        jobs: int,
+                        executor: Optional[Executor],
+                        cache: Optional[ScanCache],
+                        prefilter: Optional[Pattern[bytes]],
+                        stats: Counter) -> Iterator[Tuple[str, str, Dict[str, List[Dict]]]]:
+    placements: List[Tuple[str, str, str]] = []
+    first_paths: Dict[str, str] = {}
+    sources = _unique_sources(roots, exclude_dirs, prefilter, placements, first_paths, stats)
+    results: Dict[str, Dict[str, List[Dict]]] = {}
+    if executor is None and jobs > 1:
+        with process_pool(jobs) as pool:
+            scan = _iter_scan_sources(sources, extractors, cache, pool)
+            results.update((first_paths[path], found) for path, found in scan)
+    else:
+        scan = _iter_scan_sources(sources, extractors, cache, executor)
+        results.update((first_paths[path], found) for path, found in scan)
+    for label, path, digest in placements:
+        found = results.get(digest)
+        if found is not None:
+            yield label, path, found
+
+def scan_repo(repo_path: str,
+              extractors: Dict[str, Extractor],
+              exclude_dirs: Iterable[str] = None,
+              *,
+              jobs: int = 1,
+              executor: Optional[Executor] = None,
+              cache: Optional[ScanCache] = None,
+              prefilter: Optional[Pattern[bytes]] = None,
+              stats: Optional[Counter] = None) -> List[Tuple[str, Dict[str, List[Dict]]]]:
+    return list(iter_scan(repo_path, extractors, exclude_dirs, jobs=jobs, executor=executor,
+                          cache=cache, prefilter=prefilter, stats=stats))
@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import argparse
+import functools
+import subprocess
+from concurrent.futures import Executor
+from typing import Dict, Iterable, List, Sequence, Set
+
+from rules import RuleEngine, load_rules
+from scan_cache import ScanCache
+from scanner import EXCLUDE_DIRS_DEFAULT, Shard, iter_scan, load_event_trigger
+from statistics import collect_functions, mode_options
+
+# bump when the partial file layout changes
+PARTIAL_VERSION = 1
+MODES_DEFAULT = ("public", "extension_points")
+
+def scan_shard(targets: Dict[str, str], shard: Shard,
+               modes: Sequence[str] = MODES_DEFAULT,
+               exclude_dirs: Set[str] = None,
+               jobs: int = 1,
+               executor: Executor = None,
+               cache: ScanCache = None,
+               rules: RuleEngine = None) -> Dict:
+    """
+    The map step: trigger records and function counts of shard (i, n) of
+    every {framework: tree or archive} target, from one parse per file.
+    Files are assigned by scanner.shard_of of their path relative to the
+    target, so every host must see the targets under the same paths.
+    """
+    if exclude_dirs is None:
+        exclude_dirs = set(EXCLUDE_DIRS_DEFAULT)
+    et = load_event_trigger()
+    rules = rules or load_rules()
+    partial = {"version": PARTIAL_VERSION, "shard": list(shard), "rules": rules.digest,
+               "modes": list(modes), "targets": {}}
+    for framework, path in targets.items():
+        extractors = {"triggers": functools.partial(et.collect_triggers, framework_name=framework, rules=rules)}
+        extractors.update({f"functions:{mode}": functools.partial(collect_functions, **mode_options(mode))
+                           for mode in modes})
+        triggers: List[Dict] = []
+        functions = {mode: [0, 0] for mode in modes}
+        for file, found in iter_scan(path, extractors, exclude_dirs, jobs=jobs, executor=executor,
+                                     cache=cache, ordered=False, shard=shard):
+            triggers.extend(et.trigger_records(file, found["triggers"], rules.for_framework(framework)))
+            for mode in modes:
+                functions[mode][0] += len(found[f"functions:{mode}"])
+                functions[mode][1] += 1
+        partial["targets"][framework] = {"path": path, "triggers": triggers, "functions": functions}
+    return partial
+
+def save_partial(partial: Dict, outfile: str):
+    tmp = f"{outfile}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(partial, f)
+    os.replace(tmp, outfile)
+
+def load_partials(paths: Iterable[str]) -> List[Dict]:
+    partials = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            partials.append(json.load(f))
+    return partials
+
+def _check_partials(partials: List[Dict]):
+    if not partials:
+        raise ValueError("No partial results to merge")
+    first = partials[0]
+    for p in partials:
+        if p.get("version") != PARTIAL_VERSION:
+            raise ValueError(f"Unsupported partial version: {p.get('version')}")
+        for key in ("rules", "modes"):
+            if p[key] != first[key]:
+                raise ValueError(f"Partials disagree on {key}: {p[key]} vs {first[key]}")
+        if {fw: t["path"] for fw, t in p["targets"].items()} != {fw: t["path"] for fw, t in first["targets"].items()}:
+            raise ValueError("Partials cover different targets")
+    count = first["shard"][1]
+    indexes = sorted(p["shard"][0] for p in partials)
+    if any(p["shard"][1] != count for p in partials) or indexes != list(range(count)):
+        raise ValueError(f"Expected shards 0..{count - 1} of {count} once each, got {indexes}")
+
+def merge_partials(partials: List[Dict]) -> Dict[str, Dict]:
+    """
+    The reduce step: {framework: {"path", "triggers", "functions"}} equal to
+    a single-host find_event_triggers_in_repo (sorted triggers) and
+    count_functions_in_repo ({mode: (functions, files)}) of each target.
+    Raises ValueError unless the partials are exactly shards 0..n-1 of one run.
+    """
+    _check_partials(partials)
+    et = load_event_trigger()
+    merged: Dict[str, Dict] = {}
+    for framework, target in partials[0]["targets"].items():
+        triggers = [r for p in partials for r in p["targets"][framework]["triggers"]]
+        # a file's records all come from one shard, so ties keep their walk order
+        et.sort_triggers(triggers)
+        functions = {}
+        for mode in partials[0]["modes"]:
+            counts = [p["targets"][framework]["functions"][mode] for p in partials]
+            functions[mode] = (sum(c[0] for c in counts), sum(c[1] for c in counts))
+        merged[framework] = {"path": target["path"], "triggers": triggers, "functions": functions}
+    return merged
+
+def run_local(targets: Dict[str, str], count: int, outdir: str,
+              modes: Sequence[str] = MODES_DEFAULT) -> Dict[str, Dict]:
+    """Run every shard as its own `threatforge shard` process on this host and merge the partials."""
+    cli = os.path.join(os.path.dirname(os.path.abspath(__file__)), "threatforge.py")
+    os.makedirs(outdir, exist_ok=True)
+    specs = [f"{name}={path}" for name, path in targets.items()]
+    outfiles = [os.path.join(outdir, f"shard-{i}-of-{count}.json") for i in range(count)]
+    procs = []
+    for i, outfile in enumerate(outfiles):
+        cmd = [sys.executable, cli, "shard", *specs, "--shard", f"{i}/{count}", "-o", outfile]
+        cmd += [arg for mode in modes for arg in ("--mode", mode)]
+        procs.append(subprocess.Popen(cmd))
+    failed = [i for i, proc in enumerate(procs) if proc.wait() != 0]
+    if failed:
+        raise RuntimeError(f"Shards {failed} failed")
+    return merge_partials(load_partials(outfiles))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run all shards of a scan locally and merge them")
+    parser.add_argument("targets", nargs="+", metavar="NAME=PATH")
+    parser.add_argument("--shards", type=int, default=2)
+    parser.add_argument("--outdir", default="shards")
+    args = parser.parse_args()
+
+    merged = run_local(dict(t.partition("=")[::2] for t in args.targets), args.shards, args.outdir)
+    for fw, result in merged.items():
+        counts = ", ".join(f"{mode} {funcs} in {files} files" for mode, (funcs, files) in result["functions"].items())
+        print(f"[INFO] {fw}: {len(result['triggers'])} triggers; {counts}")
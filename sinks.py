@@ -0,0 +1,189 @@
+import re
+import ast
+from typing import Dict, List, Optional
+
+SINK_CATEGORIES = ("env", "filesystem", "network", "process")
+
+# fully qualified call or attribute names, or module prefixes, per category;
+# a name matches its longest listed prefix
+SINK_NAMES = {
+    "subprocess": "process",
+    "os.system": "process",
+    "os.popen": "process",
+    "os.execl": "process",
+    "os.execle": "process",
+    "os.execlp": "process",
+    "os.execv": "process",
+    "os.execve": "process",
+    "os.execvp": "process",
+    "os.spawnl": "process",
+    "os.spawnv": "process",
+    "os.posix_spawn": "process",
+    "os.fork": "process",
+    "os.kill": "process",
+    "pty.spawn": "process",
+    "asyncio.create_subprocess_exec": "process",
+    "asyncio.create_subprocess_shell": "process",
+
+    "open": "filesystem",
+    "io.open": "filesystem",
+    "os.open": "filesystem",
+    "os.chdir": "filesystem",
+    "os.listdir": "filesystem",
+    "os.scandir": "filesystem",
+    "os.walk": "filesystem",
+    "os.remove": "filesystem",
+    "os.unlink": "filesystem",
+    "os.rmdir": "filesystem",
+    "os.removedirs": "filesystem",
+    "os.mkdir": "filesystem",
+    "os.makedirs": "filesystem",
+    "os.rename": "filesystem",
+    "os.replace": "filesystem",
+    "os.chmod": "filesystem",
+    "os.chown": "filesystem",
+    "shutil": "filesystem",
+    "glob": "filesystem",
+    "pathlib.Path": "filesystem",
+
+    "requests": "network",
+    "httpx": "network",
+    "aiohttp": "network",
+    "urllib.request": "network",
+    "urllib3": "network",
+    "http.client": "network",
+    "socket": "network",
+    "smtplib": "network",
+    "ftplib": "network",
+    "websocket": "network",
+    "websockets": "network",
+
+    "os.environ": "env",
+    "os.getenv": "env",
+    "os.putenv": "env",
+    "os.unsetenv": "env",
+    "dotenv": "env",
+    "keyring": "env",
+    "getpass.getpass": "env",
+}
+
+# builtins that are sinks without an import
+BUILTIN_SINKS = {"open"}
+
+# string literals naming credential files, e.g. open(".env") or "~/.aws/credentials";
+# a path component must be a hint, optionally with a suffix such as ".env.local"
+SECRET_PATH_HINTS = (".env", ".ssh", ".aws", ".netrc", "id_rsa", "credentials")
+_PATH_SEP = re.compile(r"[\\/]")
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+def _add_imports(aliases: Dict[str, str], node: ast.AST):
+    if isinstance(node, ast.Import):
+        for a in node.names:
+            if a.asname:
+                aliases[a.asname] = a.name
+            else:
+                head = a.name.split(".")[0]
+                aliases[head] = head
+    elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+        for a in node.names:
+            if a.name != "*":
+                aliases[a.asname or a.name] = f"{node.module}.{a.name}"
+
+def import_aliases(tree: ast.AST) -> Dict[str, str]:
+    """
+    Local name -> fully qualified name for the absolute imports at module
+    level, including those under if/try blocks.
+    """
+    aliases: Dict[str, str] = {}
+    stack = list(getattr(tree, "body", []))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.If, ast.Try)):
+            stack.extend(node.body)
+            stack.extend(node.orelse)
+            for handler in getattr(node, "handlers", []):
+                stack.extend(handler.body)
+        else:
+            _add_imports(aliases, node)
+    return aliases
+
+def sink_category(name: str) -> Optional[str]:
+    while name:
+        category = SINK_NAMES.get(name)
+        if category is not None:
+            return category
+        name = name.rpartition(".")[0]
+    return None
+
+def _resolve(aliases: Dict[str, str], dotted: str) -> Optional[str]:
+    # only names bound by an import count, so a parameter called `socket` is not a sink
+    head, _, rest = dotted.partition(".")
+    target = aliases.get(head)
+    if target is None:
+        return head if head in BUILTIN_SINKS else None
+    return f"{target}.{rest}" if rest else target
+
+def is_secret_path(value: str) -> bool:
+    """
+    Whether a string literal looks like a path to a credential file. Prose,
+    identifiers and bare words never match: the literal holds no whitespace,
+    and a hint without a leading dot only counts inside a path or with a
+    suffix, so "credentials" is not a path but "credentials.json" is.
+    """
+    if not value or any(c.isspace() for c in value):
+        return False
+    parts = _PATH_SEP.split(value)
+    for part in parts:
+        for hint in SECRET_PATH_HINTS:
+            if part.startswith(hint + "."):
+                return True
+            if part == hint and (len(parts) > 1 or hint.startswith(".")):
+                return True
+    return False
+
+def function_sinks(fn: ast.AST, aliases: Dict[str, str]) -> List[str]:
+    """
+    Sorted sink categories reached directly by the body of fn: calls and
+    attribute reads resolving to a SINK_NAMES entry through the module's
+    imports and the function's own imports, plus credential file literals.
+    Cached on the node, as methods are scored twice.
+    """
+    cached = getattr(fn, "_tf_sinks", None)
+    if cached is not None:
+        return cached
+    nodes = list(ast.walk(fn))
+    local = None
+    for node in nodes:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if local is None:
+                local = dict(aliases)
+            _add_imports(local, node)
+    if local is not None:
+        aliases = local
+
+    body = getattr(fn, "body", [])
+    docstring = body[0].value if body and isinstance(body[0], ast.Expr) else None
+    found = set()
+    for node in nodes:
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            # calls are matched through their func node, os.environ[...] through the attribute
+            dotted = _dotted(node)
+            name = _resolve(aliases, dotted) if dotted is not None else None
+            category = sink_category(name) if name is not None else None
+            if category is not None:
+                found.add(category)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str) and node is not docstring:
+            if is_secret_path(node.value):
+                found.add("env")
+    sinks = sorted(found)
+    fn._tf_sinks = sinks  # type: ignore[attr-defined]
+    return sinks
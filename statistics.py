@@ -1,11 +1,14 @@
-import os
 import ast
-from typing import List, Tuple, Dict, Set
+import functools
+from concurrent.futures import Executor
+from typing import List, Tuple, Dict, Set, FrozenSet, Optional
 
-EXCLUDE_DIRS_DEFAULT = {
-    "tests", "__pycache__", "venv", "examples", "docs", "site-packages",
-    "build", "dist", ".tox", ".mypy_cache", ".pytest_cache", ".venv", "notebooks", "scripts"
-}
+from scan_cache import ScanCache
+from scan_profile import profile_from_env
+from scanner import EXCLUDE_DIRS_DEFAULT, iter_scan, iter_scan_versions
+
+# bump whenever FunctionCollector records change so cached scans are dropped
+EXTRACTOR_VERSION = 1
 
 PROPERTY_DECORATORS = {
     "property", "cached_property"
@@ -57,33 +60,101 @@ def _is_public(name: str) -> bool:
         return False
     return not name.startswith("_")
 
-def _is_property(fn: ast.AST) -> bool:
-    decos = _decorator_names(fn)
+def _decorators_mark_property(decos: Set[str]) -> bool:
     if any(n.endswith("cached_property") for n in decos):
         return True
     return bool(decos & PROPERTY_DECORATORS)
 
-def _is_abstract(fn: ast.AST) -> bool:
-    decos = _decorator_names(fn)
-    if decos & ABSTRACT_DECORATORS:
+def _raises_not_implemented(node: ast.Raise) -> bool:
+    exc = node.exc
+    if isinstance(exc, ast.Name) and exc.id == "NotImplementedError":
+        return True
+    if isinstance(exc, ast.Call) and isinstance(exc.func, ast.Name) and exc.func.id == "NotImplementedError":
         return True
-    # heuristic: method body raises NotImplementedError
-    for node in ast.walk(fn):
-        if isinstance(node, ast.Raise):
-            exc = node.exc
-            if isinstance(exc, ast.Name) and exc.id == "NotImplementedError":
-                return True
-            if isinstance(exc, ast.Call) and isinstance(exc.func, ast.Name) and exc.func.id == "NotImplementedError":
-                return True
     return False
 
-def _body_is_ellipsis(fn: ast.AST) -> bool:
-    # protocol style stubs: def foo(self) -> None: ...
-    if not fn.body:
+def _arg_names(fn: ast.AST) -> FrozenSet[str]:
+    args = [a.arg for a in fn.args.posonlyargs]
+    args.extend(a.arg for a in fn.args.args)
+    args.extend(a.arg for a in fn.args.kwonlyargs)
+    if fn.args.vararg:
+        args.append(fn.args.vararg.arg)
+    if fn.args.kwarg:
+        args.append(fn.args.kwarg.arg)
+    return frozenset(args)
+
+class FunctionFeatures:
+    """
+    Feature record of one function node. Everything but is_abstract reads
+    only the def line and the first statement; is_abstract needs the whole
+    body, so it is walked on first access only.
+    """
+    __slots__ = ("node", "decorators", "is_property", "body_is_ellipsis", "arg_names", "_is_abstract")
+
+    def __init__(self, node: ast.AST):
+        self.node = node
+        self.decorators = frozenset(_decorator_names(node))
+        self.is_property = _decorators_mark_property(self.decorators)
+        body = node.body  # type: ignore[attr-defined]
+        # protocol style stubs: def foo(self) -> None: ...
+        self.body_is_ellipsis = (bool(body) and isinstance(body[0], ast.Expr)
+                                 and isinstance(body[0].value, ast.Constant) and body[0].value.value is Ellipsis)
+        self.arg_names = _arg_names(node)
+        self._is_abstract: Optional[bool] = True if self.decorators & ABSTRACT_DECORATORS else None
+
+    @property
+    def is_abstract(self) -> bool:
+        if self._is_abstract is None:
+            _AbstractAnnotator().visit(self.node)
+        return self._is_abstract  # type: ignore[return-value]
+
+class _AbstractAnnotator(ast.NodeVisitor):
+    """
+    One walk over a function subtree that settles is_abstract for every
+    function in it. A `raise NotImplementedError` marks all enclosing
+    functions, which is what a per-function ast.walk used to find.
+    """
+    def __init__(self):
+        self.open: List[List] = []
+
+    def _visit_function(self, node: ast.AST):
+        entry = [node, False]
+        self.open.append(entry)
+        self.generic_visit(node)
+        self.open.pop()
+        features = function_features(node)
+        if features._is_abstract is None:
+            features._is_abstract = entry[1]
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_Raise(self, node: ast.Raise):
+        if _raises_not_implemented(node):
+            for entry in self.open:
+                entry[1] = True
+        self.generic_visit(node)
+
+def function_features(fn: ast.AST) -> FunctionFeatures:
+    """
+    Cached feature record of a function node, shared by every collector that
+    looks at the same tree. Building it does not walk the body.
+    """
+    features = getattr(fn, "_tf_features", None)
+    if features is None:
+        features = fn._tf_features = FunctionFeatures(fn)  # type: ignore[attr-defined]
+    return features
+
+def _is_property(fn: ast.AST) -> bool:
+    if not isinstance(fn, (ast.FunctionDef, ast.AsyncFunctionDef)):
         return False
-    if isinstance(fn.body[0], ast.Expr) and isinstance(fn.body[0].value, ast.Ellipsis):
-        return True
-    return False
+    return function_features(fn).is_property
+
+def _is_abstract(fn: ast.AST) -> bool:
+    return function_features(fn).is_abstract
+
+def _body_is_ellipsis(fn: ast.AST) -> bool:
+    return function_features(fn).body_is_ellipsis
 
 class FunctionCollector(ast.NodeVisitor):
     """
@@ -133,9 +204,10 @@ class FunctionCollector(ast.NodeVisitor):
             return
 
         name = node.name  # type: ignore[attr-defined]
+        features = function_features(node)
 
         # property filter
-        if not self.include_properties and _is_property(node):
+        if not self.include_properties and features.is_property:
             return
         if self.exclude_magic and _is_magic(name):
             return
@@ -143,7 +215,7 @@ class FunctionCollector(ast.NodeVisitor):
             return
 
         if self.only_extension_points:
-            if not (_is_abstract(node) or _body_is_ellipsis(node)):
+            if not (features.is_abstract or features.body_is_ellipsis):
                 return
 
         rec = {
@@ -152,11 +224,30 @@ class FunctionCollector(ast.NodeVisitor):
             "lineno": getattr(node, "lineno", None),
             "col_offset": getattr(node, "col_offset", None),
             "is_nested": parent_is_func,
-            "is_property": _is_property(node),
-            "is_abstract": _is_abstract(node),
+            "is_property": features.is_property,
+            "is_abstract": features.is_abstract,
         }
         self.records.append(rec)
 
+def collect_functions(tree: ast.AST, **options) -> List[Dict]:
+    visitor = FunctionCollector(**options)
+    visitor.visit(tree)
+    return visitor.records
+
+MODE_OPTIONS = {
+    "public": dict(count_nested=False, exclude_private=True, exclude_magic=True,
+                   include_properties=False, only_extension_points=False),
+    "all": dict(count_nested=False, exclude_private=False, exclude_magic=True,
+                include_properties=True, only_extension_points=False),
+    "extension_points": dict(count_nested=False, exclude_private=True, exclude_magic=True,
+                             include_properties=False, only_extension_points=True),
+}
+
+def mode_options(mode: str) -> Dict[str, bool]:
+    if mode not in MODE_OPTIONS:
+        raise ValueError("Unknown mode. Use 'public', 'all', or 'extension_points'.")
+    return dict(MODE_OPTIONS[mode])
+
 def count_developer_methods(repo_path: str,
                             exclude_dirs: Set[str] = None,
                             *,
@@ -164,7 +255,10 @@ def count_developer_methods(repo_path: str,
                             exclude_private: bool = True,
                             exclude_magic: bool = True,
                             include_properties: bool = False,
-                            only_extension_points: bool = False) -> Tuple[int, int]:
+                            only_extension_points: bool = False,
+                            jobs: int = 1,
+                            executor: Executor = None,
+                            cache: ScanCache = None) -> Tuple[int, int]:
 
     if exclude_dirs is None:
         exclude_dirs = set(EXCLUDE_DIRS_DEFAULT)
@@ -172,83 +266,53 @@ def count_developer_methods(repo_path: str,
     function_count = 0
     file_count = 0
 
-    for root, dirs, files in os.walk(repo_path):
-        # skip unwanted directories
-        dirs[:] = [d for d in dirs if d not in exclude_dirs and not d.startswith(".")]
-
-        for file in files:
-            if not file.endswith(".py"):
-                continue
-            # skip common test and example file patterns
-            if file.startswith("test_") or file.endswith("_test.py"):
-                continue
-            if file in {"conftest.py"}:
-                continue
-
-            filepath = os.path.join(root, file)
-            try:
-                with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-                    source = f.read()
-                tree = ast.parse(source)
-            except Exception as e:
-                print(f"[WARN] Failed parsing {filepath}: {e}")
-                continue
-
-            visitor = FunctionCollector(
-                count_nested=count_nested,
-                exclude_private=exclude_private,
-                exclude_magic=exclude_magic,
-                include_properties=include_properties,
-                only_extension_points=only_extension_points,
-            )
-            visitor.visit(tree)
-
-            if visitor.records:
-                function_count += len(visitor.records)
-                file_count += 1
-            else:
-                file_count += 1
+    extract = functools.partial(
+        collect_functions,
+        count_nested=count_nested,
+        exclude_private=exclude_private,
+        exclude_magic=exclude_magic,
+        include_properties=include_properties,
+        only_extension_points=only_extension_points,
+    )
+    for _, found in iter_scan(repo_path, {"functions": extract}, exclude_dirs,
+                              jobs=jobs, executor=executor, cache=cache, ordered=False):
+        function_count += len(found["functions"])
+        file_count += 1
 
     return function_count, file_count
 
 def count_functions_in_repo(repo_path: str,
                             mode: str = "public",
-                            exclude_dirs: List[str] = None) -> Tuple[int, int]:
+                            exclude_dirs: List[str] = None,
+                            jobs: int = 1,
+                            executor: Executor = None,
+                            cache: ScanCache = None) -> Tuple[int, int]:
     if exclude_dirs is None:
         exclude_dirs = list(EXCLUDE_DIRS_DEFAULT)
 
-    if mode == "public":
-        return count_developer_methods(
-            repo_path,
-            exclude_dirs=set(exclude_dirs),
-            count_nested=False,
-            exclude_private=True,
-            exclude_magic=True,
-            include_properties=False,
-            only_extension_points=False
-        )
-    elif mode == "all":
-        return count_developer_methods(
-            repo_path,
-            exclude_dirs=set(exclude_dirs),
-            count_nested=False,
-            exclude_private=False,
-            exclude_magic=True,
-            include_properties=True,
-            only_extension_points=False
-        )
-    elif mode == "extension_points":
-        return count_developer_methods(
-            repo_path,
-            exclude_dirs=set(exclude_dirs),
-            count_nested=False,
-            exclude_private=True,
-            exclude_magic=True,
-            include_properties=False,
-            only_extension_points=True
-        )
-    else:
-        raise ValueError("Unknown mode. Use 'public', 'all', or 'extension_points'.")
+    return count_developer_methods(repo_path, exclude_dirs=set(exclude_dirs),
+                                   jobs=jobs, executor=executor, cache=cache, **mode_options(mode))
+
+def count_functions_in_versions(versions: Dict[str, str],
+                                mode: str = "public",
+                                exclude_dirs: List[str] = None,
+                                jobs: int = 1,
+                                executor: Executor = None,
+                                cache: ScanCache = None) -> Dict[str, Tuple[int, int]]:
+    """
+    count_functions_in_repo for each of several releases or vendored copies
+    ({label: tree or archive}), parsing every distinct file content once.
+    """
+    if exclude_dirs is None:
+        exclude_dirs = list(EXCLUDE_DIRS_DEFAULT)
+
+    extract = functools.partial(collect_functions, **mode_options(mode))
+    totals = {label: [0, 0] for label in versions}
+    for label, _, found in iter_scan_versions(versions, {"functions": extract}, set(exclude_dirs),
+                                              jobs=jobs, executor=executor, cache=cache):
+        totals[label][0] += len(found["functions"])
+        totals[label][1] += 1
+    return {label: (funcs, files) for label, (funcs, files) in totals.items()}
 
 if __name__ == "__main__":
     frameworks = {
@@ -263,7 +327,8 @@ if __name__ == "__main__":
     header = f"{'Framework':<15} | {'Mode':<18} | {'Functions':<10} | {'.py Files':<10}"
     print(header)
     print("-" * len(header))
-    for name, path in frameworks.items():
-        for mode in modes:
-            funcs, files = count_functions_in_repo(path, mode=mode)
-            print(f"{name:<15} | {mode:<18} | {funcs:<10} | {files:<10}")
+    with profile_from_env():
+        for name, path in frameworks.items():
+            for mode in modes:
+                funcs, files = count_functions_in_repo(path, mode=mode)
+                print(f"{name:<15} | {mode:<18} | {funcs:<10} | {files:<10}")
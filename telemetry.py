@@ -0,0 +1,209 @@
+import os
+import csv
+import time
+import queue
+import atexit
+import threading
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+CSV_FILE = 'llm_usage.csv'
+CSV_HEADER = ['time_seconds', 'total_tokens', 'run_id', 'prompt_tokens', 'completion_tokens']
+
+BATCH_SIZE_DEFAULT = 256
+FLUSH_INTERVAL_DEFAULT = 1.0
+# longest flush() or close() waits for the writer, so a stuck disk cannot hang exit
+FLUSH_TIMEOUT_DEFAULT = 5.0
+
+class _CloseRequest(threading.Event):
+    """The flush request close() sends; the writer stops after it and only after it."""
+
+class UsageRecorder:
+    """
+    Buffered usage log. record() only enqueues a row; a daemon writer
+    thread appends batches to the CSV every flush_interval seconds or
+    batch_size rows, and whatever is left is written at interpreter exit.
+    Safe to share between threads, event loops and handlers.
+
+    Write errors are reported and the batch dropped; the writer keeps
+    running. Once closed, or if the writer is gone, record() writes
+    synchronously. Rows appended to an existing CSV follow its header, so
+    an old time_seconds,total_tokens log keeps its two columns.
+    """
+    def __init__(self, path: str = CSV_FILE, batch_size: int = BATCH_SIZE_DEFAULT,
+                 flush_interval: float = FLUSH_INTERVAL_DEFAULT):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._columns: Optional[List[int]] = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def _writer_alive(self) -> bool:
+        return self._writer is not None and self._writer.is_alive()
+
+    def record(self, run_id: Optional[UUID], elapsed: float, prompt_tokens: int = 0,
+               completion_tokens: int = 0, total_tokens: int = 0):
+        row = [round(elapsed, 2), total_tokens, str(run_id or ""), prompt_tokens, completion_tokens]
+        with self._lock:
+            # under the lock, so no row can land behind close()'s final flush request
+            if not self._closed:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run, name="usage-writer", daemon=True)
+                    self._writer.start()
+                if self._writer.is_alive():
+                    self._queue.put(row)
+                    return
+        self._write_safely([row])
+
+    def _run(self):
+        batch: List[Any] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if isinstance(item, threading.Event):
+                # flush request: everything queued before it is in batch
+                self._write_safely(batch)
+                batch = []
+                item.set()
+                if isinstance(item, _CloseRequest):
+                    return
+                continue
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write_safely(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _header_columns(self) -> Optional[List[int]]:
+        # positions in CSV_HEADER of the existing file's columns; all of them for a new file
+        try:
+            with open(self.path, newline='') as file:
+                header = next(csv.reader(file), None)
+        except FileNotFoundError:
+            header = None
+        if not header:
+            return list(range(len(CSV_HEADER)))
+        if not set(header) <= set(CSV_HEADER):
+            print(f"[WARN] {self.path} has unknown columns {header}; not appending usage rows")
+            return None
+        return [CSV_HEADER.index(name) for name in header]
+
+    def _write(self, rows: List[Any]):
+        if not rows:
+            return
+        with self._write_lock:
+            if self._columns is None:
+                self._columns = self._header_columns()
+            if self._columns is None:
+                return
+            with open(self.path, mode='a', newline='') as file:
+                writer = csv.writer(file)
+                if file.tell() == 0:
+                    writer.writerow([CSV_HEADER[i] for i in self._columns])
+                writer.writerows([row[i] for i in self._columns] for row in rows)
+
+    def _write_safely(self, rows: List[Any]):
+        try:
+            self._write(rows)
+        except (OSError, csv.Error) as e:
+            print(f"[WARN] Failed writing {len(rows)} usage rows to {self.path}: {e}")
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT_DEFAULT) -> bool:
+        """Wait up to timeout seconds until every row recorded so far is written; False if it timed out."""
+        return self._request(threading.Event(), timeout)
+
+    def _request(self, done: threading.Event, timeout: float) -> bool:
+        if not self._writer_alive():
+            return True
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = FLUSH_TIMEOUT_DEFAULT) -> bool:
+        with self._lock:
+            if self._closed:
+                return True
+            self._closed = True
+        return self._request(_CloseRequest(), timeout)
+
+_RECORDERS: Dict[str, UsageRecorder] = {}
+_RECORDERS_LOCK = threading.Lock()
+
+def shared_recorder(path: str = CSV_FILE) -> UsageRecorder:
+    """One recorder, and one writer thread, per CSV path."""
+    key = os.path.abspath(path)
+    with _RECORDERS_LOCK:
+        recorder = _RECORDERS.get(key)
+        if recorder is None:
+            recorder = _RECORDERS[key] = UsageRecorder(path)
+    return recorder
+
+def _token_usage(response: LLMResult) -> Optional[Dict[str, int]]:
+    if response.llm_output and 'token_usage' in response.llm_output:
+        return response.llm_output['token_usage']
+    return None
+
+class _UsageTiming:
+    # start times keyed by run_id, so concurrent and async runs do not overwrite each other
+    def __init__(self, csv_file: str, recorder: Optional[UsageRecorder], verbose: bool):
+        self.recorder = recorder if recorder is not None else shared_recorder(csv_file)
+        self.verbose = verbose
+        self.start_times: Dict[Optional[UUID], float] = {}
+
+    def start(self, run_id: Optional[UUID]):
+        self.start_times[run_id] = time.perf_counter()
+        if self.verbose:
+            print("Start...")
+
+    def end(self, run_id: Optional[UUID], response: LLMResult):
+        start_time = self.start_times.pop(run_id, None)
+        if start_time is None:
+            return
+        elapsed_time = time.perf_counter() - start_time
+        usage = _token_usage(response)
+        if self.verbose:
+            print(f"Consume time {elapsed_time:.2f} 秒")
+            if usage is not None:
+                print(f"Token consume: Prompt tokens = {usage.get('prompt_tokens', 0)}, "
+                      f"Completion tokens = {usage.get('completion_tokens', 0)}, "
+                      f"Total tokens = {usage.get('total_tokens', 0)}")
+            else:
+                print("error")
+        usage = usage or {}
+        self.recorder.record(run_id, elapsed_time, usage.get('prompt_tokens', 0),
+                             usage.get('completion_tokens', 0), usage.get('total_tokens', 0))
+
+class TokenAndTimeCallback(BaseCallbackHandler):
+    """Per-run latency and token usage, logged through a UsageRecorder off the calling thread."""
+    def __init__(self, csv_file: str = CSV_FILE, recorder: UsageRecorder = None, verbose: bool = True) -> None:
+        self.timing = _UsageTiming(csv_file, recorder, verbose)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID = None,
+                     **kwargs: Any) -> None:
+        self.timing.start(run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID = None, **kwargs: Any) -> None:
+        self.timing.end(run_id, response)
+
+class AsyncTokenAndTimeCallback(AsyncCallbackHandler):
+    """TokenAndTimeCallback for async callback managers; never awaits I/O."""
+    def __init__(self, csv_file: str = CSV_FILE, recorder: UsageRecorder = None, verbose: bool = True) -> None:
+        self.timing = _UsageTiming(csv_file, recorder, verbose)
+
+    async def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID = None,
+                           **kwargs: Any) -> None:
+        self.timing.start(run_id)
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID = None, **kwargs: Any) -> None:
+        self.timing.end(run_id, response)
@@ -1,54 +1,180 @@
-import time
-import csv
-from dotenv import load_dotenv
 import os
-from typing import Any, Dict, List
+import sys
+import time
+import shutil
+import argparse
+import contextlib
+import importlib
+import importlib.util
+import tempfile
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 from langchain_core.callbacks import BaseCallbackHandler
-from langchain_core.outputs import LLMResult
-from langchain_groq import ChatGroq
-
-load_dotenv()
-api_key = os.getenv("GROQ_API_KEY")
-CSV_FILE = 'llm_usage.csv'
-
-class TokenAndTimeCallback(BaseCallbackHandler):
-    def __init__(self) -> None:
-        self.start_time = None
-
-    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
-        self.start_time = time.time()
-        print("Start...")
-
-    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
-        if self.start_time is None:
-            return
-
-        end_time = time.time()
-        elapsed_time = end_time - self.start_time
-        print(f"Consume time {elapsed_time:.2f} 秒")
-
-        total_tokens = 0
-        if response.llm_output and 'token_usage' in response.llm_output:
-            usage = response.llm_output['token_usage']
-            prompt_tokens = usage.get('prompt_tokens', 0)
-            completion_tokens = usage.get('completion_tokens', 0)
-            total_tokens = usage.get('total_tokens', 0)
-            print(
-                f"Token consume: Prompt tokens = {prompt_tokens}, Completion tokens = {completion_tokens}, Total tokens = {total_tokens}")
-        else:
-            print("error")
-
-        with open(CSV_FILE, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            if os.path.getsize(CSV_FILE) == 0:
-                writer.writerow(['time_seconds', 'total_tokens'])
-            writer.writerow([round(elapsed_time, 2), total_tokens])
-
-llm = ChatGroq(
-    model="deepseek-r1-distill-llama-70b",
-    callbacks=[TokenAndTimeCallback()]
-)
-
-for n in list(range(0, 1001, 30)) + [1000]:
-    response = llm.invoke(f"Give me {n} words")  #
\ No newline at end of file
+from langchain_core.messages import HumanMessage
+
+from replay_llm import Cassette, ReplayChatModel
+from telemetry import CSV_FILE, TokenAndTimeCallback, UsageRecorder
+
+# the 0..1000 words sweep
+WORKLOAD = [f"Give me {n} words" for n in list(range(0, 1001, 30)) + [1000]]
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of signed nanosecond values: each power of two is
+    split into 2**precision_bits buckets, so any percentile is within about
+    1 / 2**precision_bits of the true value at a fixed memory cost. Negative
+    values, e.g. an overhead sample faster than the baseline median, get the
+    mirrored buckets.
+    """
+    def __init__(self, precision_bits: int = 7):
+        self.precision_bits = precision_bits
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.max: Optional[int] = None
+
+    def _bucket(self, value: int) -> int:
+        # values below 2**(precision_bits + 1) are exact, larger ones keep their top bits
+        shift = max(value.bit_length() - 1 - self.precision_bits, 0)
+        return (shift << self.precision_bits) + (value >> shift)
+
+    def _lower_bound(self, bucket: int) -> int:
+        shift = max((bucket >> self.precision_bits) - 1, 0)
+        return (bucket - (shift << self.precision_bits)) << shift
+
+    def record(self, value: int):
+        value = int(value)
+        # -bucket sorts below 0 and below every smaller magnitude
+        bucket = self._bucket(value) if value >= 0 else -self._bucket(-value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p: float) -> int:
+        if not self.total:
+            return 0
+        rank = max(1, int(round(p / 100 * self.total)))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return self._lower_bound(bucket) if bucket >= 0 else -self._lower_bound(-bucket)
+        return self.max
+
+def offline_backend(workload: Sequence[str] = WORKLOAD) -> ReplayChatModel:
+    """ReplayChatModel answering every workload prompt with as many words as it asks for."""
+    cassette = Cassette()
+    for prompt in workload:
+        n = int(prompt.split()[2])
+        cassette.add_text([HumanMessage(content=prompt)], " ".join(["word"] * n))
+    return ReplayChatModel(cassette=cassette)
+
+def _time_workload(llm, workload: Sequence[str], handlers: List[BaseCallbackHandler]) -> List[int]:
+    timings = []
+    config = {"callbacks": handlers}
+    for prompt in workload:
+        start = time.perf_counter_ns()
+        llm.invoke(prompt, config=config)
+        timings.append(time.perf_counter_ns() - start)
+    return timings
+
+def measure_overhead(handler_factories: Dict[str, Callable[[], BaseCallbackHandler]],
+                     workload: Sequence[str] = WORKLOAD,
+                     repeat: int = 20,
+                     llm=None) -> Dict[str, Dict[str, float]]:
+    """
+    Per-call latency each handler adds over a no-callback run of the same
+    prompt, against an offline backend. Rounds interleave the configurations
+    so drift hits all of them alike; handler output is discarded.
+
+    Returns {name: {"p50_us", "p95_us", "p99_us", "max_us", "calls"}}, with
+    "none" holding the raw no-callback latency. Overhead samples keep their
+    sign, so a handler within noise of the baseline shows a p50 near 0.
+    """
+    if llm is None:
+        llm = offline_backend(workload)
+    baseline: List[List[int]] = [[] for _ in workload]
+    calls: Dict[str, List[List[int]]] = {name: [[] for _ in workload] for name in handler_factories}
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        _time_workload(llm, workload, [])  # warm up
+        for _ in range(repeat):
+            for i, t in enumerate(_time_workload(llm, workload, [])):
+                baseline[i].append(t)
+            for name, factory in handler_factories.items():
+                for i, t in enumerate(_time_workload(llm, workload, [factory()])):
+                    calls[name][i].append(t)
+
+    medians = [sorted(ts)[len(ts) // 2] for ts in baseline]
+    report = {"none": _summary(LatencyHistogram(), (t for ts in baseline for t in ts))}
+    for name, per_prompt in calls.items():
+        overhead = (t - medians[i] for i, ts in enumerate(per_prompt) for t in ts)
+        report[name] = _summary(LatencyHistogram(), overhead)
+    return report
+
+def _summary(hist: LatencyHistogram, values) -> Dict[str, float]:
+    for v in values:
+        hist.record(v)
+    return {
+        "p50_us": hist.percentile(50) / 1000,
+        "p95_us": hist.percentile(95) / 1000,
+        "p99_us": hist.percentile(99) / 1000,
+        "max_us": (hist.max or 0) / 1000,
+        "calls": hist.total,
+    }
+
+def print_overhead(report: Dict[str, Dict[str, float]]):
+    header = f"{'Handler':<32} | {'p50 us':<9} | {'p95 us':<9} | {'p99 us':<9} | {'Calls':<6}"
+    print(header)
+    print("-" * len(header))
+    for name, r in report.items():
+        print(f"{name:<32} | {r['p50_us']:<9.1f} | {r['p95_us']:<9.1f} | {r['p99_us']:<9.1f} | {r['calls']:<6}")
+    print("[INFO] 'none' is raw offline latency; other rows are overhead over it")
+
+def _handler_factory(spec: str) -> Tuple[str, Callable[[], BaseCallbackHandler]]:
+    # "module:Class" or "path/to/file.py:Class"
+    target, _, class_name = spec.rpartition(":")
+    if target.endswith(".py"):
+        spec_ = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(target))[0], target)
+        module = importlib.util.module_from_spec(spec_)
+        spec_.loader.exec_module(module)
+    else:
+        module = importlib.import_module(target)
+    from sandbox_runner import instantiate_handler
+    cls = getattr(module, class_name)
+    return class_name, lambda: instantiate_handler(cls)
+
+def run_live_sweep():
+    """The original sweep against the hosted model, appending to llm_usage.csv."""
+    from dotenv import load_dotenv
+    from langchain_groq import ChatGroq
+
+    load_dotenv()
+    api_key = os.getenv("GROQ_API_KEY")
+    llm = ChatGroq(
+        model="deepseek-r1-distill-llama-70b",
+        api_key=api_key,
+        callbacks=[TokenAndTimeCallback()]
+    )
+    for prompt in WORKLOAD:
+        llm.invoke(prompt)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Callback handler overhead on the 0..1000 words sweep")
+    parser.add_argument("--handler", action="append", default=[],
+                        help="extra handler to measure, as module:Class or file.py:Class")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--live", action="store_true", help="run the sweep against ChatGroq instead")
+    args = parser.parse_args()
+
+    if args.live:
+        run_live_sweep()
+        sys.exit(0)
+
+    scratch = tempfile.mkdtemp(prefix="threatforge-overhead-")
+    try:
+        recorder = UsageRecorder(os.path.join(scratch, CSV_FILE))
+        factories = {"TokenAndTimeCallback": lambda: TokenAndTimeCallback(recorder=recorder)}
+        factories.update(_handler_factory(spec) for spec in args.handler)
+        print_overhead(measure_overhead(factories, repeat=args.repeat))
+        recorder.close()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
@@ -0,0 +1,328 @@
+import os
+import sys
+import json
+import argparse
+import contextlib
+from collections import Counter
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+
+# framework name -> source tree, as in the per-script __main__ reports
+FRAMEWORKS_DEFAULT = {
+    "LangChain": "langchain",
+    "LlamaIndex": "llama_index",
+    "SemanticKernel": "semantic-kernel/python",
+    "AutoGPT": "Auto-GPT",
+    "CrewAI": "crewAI",
+}
+
+MODES_DEFAULT = ["public", "extension_points"]
+FORMATS = ("table", "tsv", "json")
+
+# Subcommands import the scan engine, sandbox and framework modules only when
+# they run, so `--help` and a static scan never load langchain or kivy.
+
+def _targets(specs: List[str], framework: str, versions: bool = False) -> Dict[str, str]:
+    """
+    NAME=PATH or bare PATH targets; none means FRAMEWORKS_DEFAULT. A bare
+    PATH is named `framework`, or after its file name when the targets are
+    versions of one framework.
+    """
+    if not specs:
+        return dict(FRAMEWORKS_DEFAULT)
+    targets = {}
+    for spec in specs:
+        name, sep, path = spec.partition("=")
+        if not sep:
+            path = spec
+            name = os.path.basename(os.path.normpath(spec)) if versions else framework
+        targets[name] = path
+    return targets
+
+@contextlib.contextmanager
+def _engine(args) -> Iterator[Tuple[Optional[object], Optional[object]]]:
+    """(executor, cache) shared by every target of one command."""
+    from scanner import process_pool
+    with contextlib.ExitStack() as stack:
+        cache = None
+        if args.cache:
+            from scan_cache import ScanCache
+            cache = stack.enter_context(ScanCache(args.cache))
+        pool = stack.enter_context(process_pool(args.jobs)) if args.jobs > 1 else None
+        yield pool, cache
+
+@contextlib.contextmanager
+def _output(path: Optional[str]) -> Iterator[IO[str]]:
+    if not path or path == "-":
+        yield sys.stdout
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            yield f
+
+def _write_tsv(out: IO[str], header: List[str], rows: List[List]):
+    import csv
+    writer = csv.writer(out, delimiter="\t", lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(rows)
+
+def _trigger_scans(args, targets: Dict[str, str], hierarchy: bool) -> Dict[str, object]:
+    from scanner import load_event_trigger
+    from rules import load_rules
+    et = load_event_trigger()
+    rules = load_rules(args.rules)
+    with _engine(args) as (pool, cache):
+        return {fw: et.get_trigger_scan(path, fw, executor=pool, cache=cache, hierarchy=hierarchy, rules=rules)
+                for fw, path in targets.items()}
+
+def _version_scans(args, versions: Dict[str, str]) -> Dict[str, object]:
+    from scanner import load_event_trigger
+    from rules import load_rules
+    et = load_event_trigger()
+    stats = Counter()
+    with _engine(args) as (pool, cache):
+        found = et.find_event_triggers_in_versions(versions, args.framework, executor=pool, cache=cache,
+                                                   stats=stats, rules=load_rules(args.rules))
+    print(f"[INFO] {stats['unique']} distinct contents in {stats['files']} files", file=sys.stderr)
+    return {label: et.TriggerScanResult(label, versions[label], triggers) for label, triggers in found.items()}
+
+def _print_triggers(scans: Dict[str, object], topk: int, out: IO[str]):
+    header = f"{'Framework':<15} | {'Count':<5} | {'Top examples':<60}"
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for fw, res in scans.items():
+        print(f"{fw:<15} | {len(res):<5} | {('; '.join(res.examples(topk))):<60}", file=out)
+
+def cmd_scan(args) -> int:
+    if args.dedup:
+        if args.hierarchy:
+            print("[WARN] --hierarchy needs one class index per tree and is not available with --dedup",
+                  file=sys.stderr)
+            return 2
+        scans = _version_scans(args, _targets(args.targets, args.framework, versions=True))
+    else:
+        scans = _trigger_scans(args, _targets(args.targets, args.framework), args.hierarchy)
+    with _output(args.output) as out:
+        if args.format == "json":
+            json.dump({fw: {"path": res.repo_path, "count": len(res), "triggers": res.triggers}
+                       for fw, res in scans.items()}, out, indent=2)
+            out.write("\n")
+        elif args.format == "tsv":
+            _write_tsv(out, ["framework", "file", "class", "func", "lineno", "score", "tags", "sinks"],
+                       [row for res in scans.values() for row in res.tsv_rows()])
+        else:
+            _print_triggers(scans, args.top, out)
+    return 0
+
+def _count_rows(targets: Dict[str, str], modes: List[str], pool, cache) -> List[List]:
+    from statistics import count_functions_in_repo
+    rows = []
+    for name, path in targets.items():
+        for mode in modes:
+            funcs, files = count_functions_in_repo(path, mode=mode, executor=pool, cache=cache)
+            rows.append([name, mode, funcs, files])
+    return rows
+
+def _print_counts(rows: List[List], out: IO[str]):
+    header = f"{'Framework':<15} | {'Mode':<18} | {'Functions':<10} | {'.py Files':<10}"
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for name, mode, funcs, files in rows:
+        print(f"{name:<15} | {mode:<18} | {funcs:<10} | {files:<10}", file=out)
+
+def _version_count_rows(versions: Dict[str, str], modes: List[str], pool, cache) -> List[List]:
+    from statistics import count_functions_in_versions
+    rows = []
+    for mode in modes:
+        totals = count_functions_in_versions(versions, mode=mode, executor=pool, cache=cache)
+        rows.extend([label, mode, funcs, files] for label, (funcs, files) in totals.items())
+    return rows
+
+def cmd_count(args) -> int:
+    modes = args.mode or MODES_DEFAULT
+    with _engine(args) as (pool, cache):
+        if args.dedup:
+            rows = _version_count_rows(_targets(args.targets, args.framework, versions=True), modes, pool, cache)
+        else:
+            rows = _count_rows(_targets(args.targets, args.framework), modes, pool, cache)
+    with _output(args.output) as out:
+        if args.format == "json":
+            json.dump([dict(zip(("framework", "mode", "functions", "files"), r)) for r in rows], out, indent=2)
+            out.write("\n")
+        elif args.format == "tsv":
+            _write_tsv(out, ["framework", "mode", "functions", "files"], rows)
+        else:
+            _print_counts(rows, out)
+    return 0
+
+def cmd_validate(args) -> int:
+    import sandbox_runner
+    scans = _trigger_scans(args, _targets(args.targets, args.framework), hierarchy=True)
+    candidates = list(dict.fromkeys(
+        c for res in scans.values()
+        for c in sandbox_runner.candidates_from_triggers(res.triggers, args.min_score, args.sinks_only)))
+    print(f"[INFO] Validating {len(candidates)} candidate classes", file=sys.stderr)
+    results = sandbox_runner.validate_candidates(
+        candidates, jobs=args.jobs,
+        timeout=args.timeout if args.timeout is not None else sandbox_runner.TIMEOUT_DEFAULT,
+        memory_mb=args.memory_mb if args.memory_mb is not None else sandbox_runner.MEMORY_MB_DEFAULT)
+    with contextlib.redirect_stdout(sys.stderr):  # keep stdout for --format output
+        sandbox_runner.save_report(results, args.report or sandbox_runner.REPORT_DEFAULT)
+    summary = sandbox_runner.summarize(results)
+    with _output(args.output) as out:
+        if args.format == "json":
+            json.dump(summary, out, indent=2)
+            out.write("\n")
+        elif args.format == "tsv":
+            _write_tsv(out, ["status", "count"], sorted(summary["status"].items()))
+        else:
+            for status, n in sorted(summary["status"].items()):
+                print(f"[INFO] {status}: {n}", file=out)
+            print(f"[INFO] with side effects: {summary['with_side_effects']}", file=out)
+            print(f"[INFO] with network egress: {summary['with_egress']}", file=out)
+    return 0
+
+def cmd_report(args) -> int:
+    """The event-trigger.py and statistics.py reports in one run: summaries on stdout, details to a file."""
+    from scanner import load_event_trigger
+    from rules import load_rules
+    et = load_event_trigger()
+    targets = _targets(args.targets, args.framework)
+    rules = load_rules(args.rules)
+    scans, rows = {}, []
+    # one parse per file feeds the triggers, the class index and every count mode
+    with _engine(args) as (pool, cache):
+        for fw, path in targets.items():
+            found = et.scan_framework(path, fw, modes=MODES_DEFAULT, executor=pool, cache=cache, rules=rules,
+                                      hierarchy=True)
+            scans[fw] = et.TriggerScanResult(fw, path, found["triggers"])
+            rows.extend([fw, mode, funcs, files] for mode, (funcs, files) in found["counts"].items())
+    _print_triggers(scans, args.top, sys.stdout)
+    if args.format == "json":
+        outfile = args.output or "event_triggers.json"
+        with _output(outfile) as out:
+            json.dump({fw: res.triggers for fw, res in scans.items()}, out, indent=2)
+    else:
+        outfile = args.output or "event_triggers.tsv"
+        with _output(outfile) as out:
+            _write_tsv(out, ["framework", "file", "class", "func", "lineno", "score", "tags", "sinks"],
+                       [row for res in scans.values() for row in res.tsv_rows()])
+    print(f"[INFO] Saved details to {outfile}")
+    print()
+    _print_counts(rows, sys.stdout)
+    return 0
+
+def cmd_shard(args) -> int:
+    import shards
+    from rules import load_rules
+    from scanner import parse_shard
+    try:
+        shard = parse_shard(args.shard)
+    except ValueError as e:
+        print(f"[WARN] {e}", file=sys.stderr)
+        return 2
+    with _engine(args) as (pool, cache):
+        partial = shards.scan_shard(_targets(args.targets, args.framework), shard, args.mode or MODES_DEFAULT,
+                                    executor=pool, cache=cache, rules=load_rules(args.rules))
+    outfile = args.output or f"shard-{shard[0]}-of-{shard[1]}.json"
+    shards.save_partial(partial, outfile)
+    print(f"[INFO] Saved shard {shard[0]}/{shard[1]} to {outfile}", file=sys.stderr)
+    return 0
+
+def cmd_merge(args) -> int:
+    import shards
+    try:
+        merged = shards.merge_partials(shards.load_partials(args.partials))
+    except ValueError as e:
+        print(f"[WARN] {e}", file=sys.stderr)
+        return 2
+    with _output(args.output) as out:
+        if args.format == "json":
+            json.dump(merged, out, indent=2)
+            out.write("\n")
+        elif args.format == "tsv":
+            _write_tsv(out, ["framework", "file", "class", "func", "lineno", "score", "tags", "sinks"],
+                       [[fw, r["file"], r["class"] or "", r["func"], r["lineno"] or "", r["score"], ",".join(r["tags"]),
+                         ",".join(r["sinks"])]
+                        for fw, result in merged.items() for r in result["triggers"]])
+        else:
+            from scanner import load_event_trigger
+            et = load_event_trigger()
+            _print_triggers({fw: et.TriggerScanResult(fw, result["path"], result["triggers"])
+                             for fw, result in merged.items()}, args.top, out)
+            print(file=out)
+            _print_counts([[fw, mode, funcs, files] for fw, result in merged.items()
+                           for mode, (funcs, files) in result["functions"].items()], out)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("targets", nargs="*", metavar="NAME=PATH",
+                        help="framework trees or .whl/.zip/.tar.gz archives to analyse (default: the five "
+                             "studied frameworks); a bare PATH is scored as --framework")
+    common.add_argument("--framework", default="LangChain", help="framework rules for bare PATH targets")
+    common.add_argument("--jobs", type=int, default=1, help="worker processes")
+    common.add_argument("--cache", default=None, metavar="DIR",
+                        help="reuse per-file results from a scan cache in DIR, e.g. .threatforge-cache")
+    common.add_argument("--format", choices=FORMATS, default="table")
+    common.add_argument("--output", "-o", default=None, help="write to this file instead of stdout")
+
+    versions = argparse.ArgumentParser(add_help=False)
+    versions.add_argument("--dedup", action="store_true",
+                          help="targets are releases or vendored copies of --framework: parse each distinct "
+                               "file content once and report per target")
+
+    parser = argparse.ArgumentParser(prog="threatforge",
+                                     description="Static and dynamic analysis of LLM framework callback handlers")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scan = sub.add_parser("scan", parents=[common, versions], help="score event-trigger candidates")
+    scan.add_argument("--top", type=int, default=50, help="records the table examples are drawn from")
+    scan.add_argument("--hierarchy", action="store_true", help="score transitive callback subclasses")
+    scan.add_argument("--rules", default=None, help="scoring rules JSON (default: rules.json)")
+    scan.set_defaults(func=cmd_scan)
+
+    count = sub.add_parser("count", parents=[common, versions], help="count functions per counting mode")
+    count.add_argument("--mode", action="append", choices=["public", "all", "extension_points"],
+                       help="counting mode, repeatable (default: public and extension_points)")
+    count.set_defaults(func=cmd_count)
+
+    validate = sub.add_parser("validate", parents=[common], help="run candidate handlers in sandboxed workers")
+    validate.add_argument("--rules", default=None, help="scoring rules JSON (default: rules.json)")
+    validate.add_argument("--min-score", type=int, default=3)
+    validate.add_argument("--sinks-only", action="store_true", help="only classes whose handlers reach a static sink")
+    validate.add_argument("--timeout", type=float, default=None, help="seconds per candidate (default: 30)")
+    validate.add_argument("--memory-mb", type=int, default=None, help="address space per worker, 0 for no limit (default: 4096)")
+    validate.add_argument("--report", default=None, help="full JSON report (default: validation_report.json)")
+    validate.set_defaults(func=cmd_validate)
+
+    report = sub.add_parser("report", parents=[common],
+                            help="trigger and function count summaries, trigger details to --output")
+    report.add_argument("--top", type=int, default=50)
+    report.add_argument("--rules", default=None, help="scoring rules JSON (default: rules.json)")
+    report.set_defaults(func=cmd_report)
+
+    shard = sub.add_parser("shard", parents=[common],
+                           help="map step of a multi-host scan: triggers and counts of one shard to a partial file")
+    shard.add_argument("--shard", required=True, metavar="I/N", help="scan shard I of N, 0 <= I < N")
+    shard.add_argument("--mode", action="append", choices=["public", "all", "extension_points"],
+                       help="counting mode, repeatable (default: public and extension_points)")
+    shard.add_argument("--rules", default=None, help="scoring rules JSON (default: rules.json)")
+    shard.set_defaults(func=cmd_shard)
+
+    merge = sub.add_parser("merge", help="reduce step: combine the partial files of every shard")
+    merge.add_argument("partials", nargs="+", metavar="PARTIAL")
+    merge.add_argument("--format", choices=FORMATS, default="table")
+    merge.add_argument("--output", "-o", default=None, help="write to this file instead of stdout")
+    merge.add_argument("--top", type=int, default=50)
+    merge.set_defaults(func=cmd_merge)
+    return parser
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "jobs", 1) < 1:
+        args.jobs = os.cpu_count() or 1
+    from scan_profile import profile_from_env
+    with profile_from_env():
+        return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())